@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+bench_extract_modes.py
+
+Compare les deux modes d'extraction de get_scope() sur des réponses enregistrées.
+
+Le serveur local (fixture_server.py) rejoue la page des scopes et les réponses
+GraphQL sauvegardées dans bench/fixtures/. Le script vérifie d'abord que le
+parsing du payload enregistré donne le scope attendu, puis mesure le temps de
+get_scope() en mode "dom" (texte rendu) et "network" (réponses JSON).
+
+Usage :
+    python3 bench/bench_extract_modes.py [-n 10]
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent))
+
+import scrape_hackerone_full as shf  # noqa: E402
+from fixture_server import FIXTURES, start_server  # noqa: E402
+
+# scope attendu pour graphql_structured_scopes.json (assets éligibles URL/WILDCARD)
+EXPECTED = {
+    "domains": ["tax.audible.com"],
+    "urls": ["https://www.audible.co.uk"],
+    "wildcards": ["*.audible.de"],
+}
+
+
+def run(mode, handles):
+    """Appelle get_scope() en `mode` sur `handles` et retourne (dernier scope, secondes)."""
+    with shf.ScraperSession() as session:
+        t0 = time.perf_counter()
+        for h in handles:
+            scope = shf.get_scope(h, session=session, mode=mode)
+        elapsed = time.perf_counter() - t0
+    print(f"{mode:<10} {elapsed:>8.2f} s   {scope}")
+    return scope, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("-n", "--pages", type=int, default=10, help="nombre de pages programme à charger")
+    args = parser.parse_args()
+
+    # parsing hors navigateur des réponses enregistrées
+    payload = json.loads((FIXTURES / "graphql_structured_scopes.json").read_text())
+    parsed = shf._scope_from_payload(payload)
+    assert parsed == EXPECTED, parsed
+    profile = json.loads((FIXTURES / "graphql_team_profile.json").read_text())
+    assert shf._scope_from_payload(profile) is None
+    print("[+] recorded payloads parsed as expected")
+
+    server, _ = start_server(shf)
+    handles = [f"program{i}" for i in range(args.pages)]
+    run("dom", handles)
+    network, _ = run("network", handles)
+    server.shutdown()
+    assert network == EXPECTED, network
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+bench_resource_blocking.py
+
+Benchmark du blocage des ressources (page.route) du scraper.
+
+Sert les pages HTML sauvegardées de bench/fixtures/ via un serveur HTTP local
+(les CSS, polices, images et trackers référencés sont générés à la volée avec
+des tailles réalistes), puis lance get_scope() sur N handles avec et sans
+blocage. Affiche les octets transférés par le serveur et le temps total.
+
+Usage :
+    python3 bench/bench_resource_blocking.py [-n 20]
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent))
+
+import scrape_hackerone_full as shf  # noqa: E402
+from fixture_server import FixtureHandler, start_server  # noqa: E402
+
+
+def run(label, allowed, handles):
+    """Scrape `handles` sur le serveur local et retourne (octets, secondes)."""
+    FixtureHandler.bytes_sent = 0
+    with shf.ScraperSession(allowed_resources=allowed) as session:
+        t0 = time.perf_counter()
+        for h in handles:
+            scope = shf.get_scope(h, session=session)
+        elapsed = time.perf_counter() - t0
+    sent = FixtureHandler.bytes_sent
+    print(f"{label:<22} {sent / 1024:>10.1f} KiB {elapsed:>9.2f} s   last scope: {scope}")
+    return sent, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("-n", "--pages", type=int, default=20, help="nombre de pages programme à charger")
+    args = parser.parse_args()
+
+    server, _ = start_server(shf)
+    handles = [f"program{i}" for i in range(args.pages)]
+
+    print(f"{'mode':<22} {'transferred':>14} {'wall time':>11}")
+    full = run("no blocking", None, handles)
+    blocked = run("blocking (default)", shf.ALLOWED_RESOURCE_TYPES, handles)
+    server.shutdown()
+
+    print(f"\n-> {100 * (1 - blocked[0] / full[0]):.0f}% bytes saved, "
+          f"{full[1] - blocked[1]:+.2f} s over {args.pages} pages")
+
+
+if __name__ == "__main__":
+    main()
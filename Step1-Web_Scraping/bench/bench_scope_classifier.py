@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+bench_scope_classifier.py
+
+Micro-benchmark du classifieur de lignes de scope (ScopeClassifier) contre
+l'ancienne boucle de get_scope (regex non compilées, dédoublonnage sur listes).
+
+Les textes de scope sont reconstitués comme le rendu de la section "In scope"
+(cible, type, éligibilité, description) à partir de programs.json, plus un
+gros programme synthétique pour montrer le coût du dédoublonnage O(n²).
+
+Usage :
+    python3 bench/bench_scope_classifier.py [-r 5] [--big 20000]
+"""
+
+import re
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent))
+
+import scrape_hackerone_full as shf  # noqa: E402
+
+PROGRAMS = HERE.parent / "programs.json"
+TYPES = {"domains": "Domain", "urls": "URL", "wildcards": "Wildcard"}
+
+
+def legacy_parse_scope_text(content):
+    """Ancienne boucle de get_scope (référence pour le benchmark)."""
+    out = {"domains": [], "urls": [], "wildcards": []}
+    lines = [x.strip() for x in content.splitlines() if x.strip()]
+    for line in lines:
+        if len(line) > 150:
+            continue
+        if re.search(r"\b(hackerone\.com|policy|support)\b", line, re.I):
+            continue
+        if "*" in line:
+            if line not in out["wildcards"]:
+                out["wildcards"].append(line)
+        elif re.match(r"^https?://", line):
+            if line not in out["urls"]:
+                out["urls"].append(line)
+        elif re.match(r"^(?:[\w\-]+\.)+[a-z]{2,}$", line):
+            if line not in out["domains"]:
+                out["domains"].append(line)
+    return {k: v for k, v in out.items() if v}
+
+
+def render_scope(scope):
+    """Texte façon inner_text() d'une section scope rendue."""
+    lines = ["In scope", "Asset name", "Type", "Coverage", "Max. severity", "Bounty"]
+    for key, values in scope.items():
+        for v in values:
+            target = v.split("\t")[0]
+            lines += [target, TYPES.get(key, key), "In scope", "Critical", "Eligible",
+                      f"Please read the program policy before testing {target}."]
+    return "\n".join(lines)
+
+
+def big_scope_text(n):
+    """Programme synthétique de `n` cibles (avec doublons, comme les scopes géants)."""
+    lines = ["In scope"]
+    for i in range(n):
+        j = i % (n // 2 or 1)
+        lines += [f"host{j}.example.com", f"https://app{j}.example.com", f"*.zone{j}.example.com", "Eligible"]
+    return "\n".join(lines)
+
+
+def bench(label, func, texts, rounds):
+    """Meilleur temps sur `rounds` passes de `func` sur tous les textes."""
+    best = float("inf")
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        for t in texts:
+            func(t)
+        best = min(best, time.perf_counter() - t0)
+    print(f"  {label:<18} {best * 1000:>10.2f} ms")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("-r", "--rounds", type=int, default=5, help="nombre de passes (meilleur temps retenu)")
+    parser.add_argument("--big", type=int, default=20000, help="taille du programme synthétique")
+    args = parser.parse_args()
+
+    programs = json.loads(PROGRAMS.read_text(encoding="utf-8"))
+    texts = [render_scope(scope) for scope in programs.values() if scope]
+    big = [big_scope_text(args.big)]
+
+    for label, corpus in ((f"programs.json ({len(texts)} scopes)", texts),
+                          (f"synthetic ({args.big * 3} targets)", big)):
+        # même résultat attendu entre l'ancienne et la nouvelle implémentation
+        assert all(legacy_parse_scope_text(t) == shf._parse_scope_text(t) for t in corpus)
+        print(label)
+        old = bench("legacy loop", legacy_parse_scope_text, corpus, args.rounds)
+        new = bench("ScopeClassifier", shf._parse_scope_text, corpus, args.rounds)
+        print(f"  -> x{old / new:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+check_journal.py
+
+Vérification de non-régression du journal de checkpoint (CheckpointJournal) : un crash
+pendant l'écriture laisse une dernière ligne tronquée. Après une reprise, les
+enregistrements suivants doivent rester lisibles et tous les handles terminés doivent
+se retrouver dans programs.json après compaction.
+
+Aucun navigateur ni accès réseau.
+
+Usage :
+    python3 bench/check_journal.py
+"""
+
+import sys
+import json
+import tempfile
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent))
+
+import scrape_hackerone_full as shf  # noqa: E402
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        save_path = Path(tmp) / "programs.json"
+        journal_path = Path(tmp) / "programs.checkpoint.jsonl"
+
+        # run interrompu : "a" terminé, "b" tronqué en pleine écriture
+        journal = shf.CheckpointJournal(str(journal_path))
+        journal.record_handles(["a", "b", "c"])
+        journal.record("a", {"domains": ["a.example"]})
+        with journal_path.open("a", encoding="utf-8") as f:
+            f.write('{"handle": "b", "sc')
+
+        # reprise : "b" n'est pas compté comme fait, puis "b" et "c" sont enregistrés
+        journal = shf.CheckpointJournal(str(journal_path))
+        handles, done = journal.load()
+        assert handles == ["a", "b", "c"], handles
+        assert set(done) == {"a"}, done
+        assert journal_path.read_bytes().endswith(b"\n"), "ligne tronquée non retirée"
+        journal.record("b", {"domains": ["b.example"]})
+        journal.record("c", {"domains": ["c.example"]})
+
+        result = shf.compact_journal(str(journal_path), str(save_path), handles)
+        assert list(result) == ["a", "b", "c"], list(result)
+        assert json.loads(save_path.read_text()) == result
+    print("[+] check_journal : OK (ligne tronquée retirée, a/b/c compactés)")
+
+
+if __name__ == "__main__":
+    main()
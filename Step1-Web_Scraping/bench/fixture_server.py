@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+fixture_server.py
+
+Petit serveur HTTP local qui rejoue des pages HackerOne sauvegardées (bench/fixtures/)
+pour les benchmarks du scraper, sans toucher au vrai site :
+- /directory/programs      -> directory.html
+- /<handle>/policy_scopes  -> policy_scopes.html (scope chargé via POST /graphql)
+- /<handle>                -> program.html (scope dans le HTML rendu)
+- POST /graphql            -> réponses JSON enregistrées (selon operationName), avec le
+                              handle d'équipe de la requête (variables.handle)
+- /assets/*                -> CSS, JS, polices, images générés à la volée
+
+Le serveur compte les octets envoyés (FixtureHandler.bytes_sent).
+"""
+
+import json
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+# Taille (octets) des ressources statiques simulées, par extension
+ASSET_SIZES = {
+    ".css": 180_000,
+    ".js": 60_000,
+    ".woff2": 90_000,
+    ".jpg": 350_000,
+    ".png": 40_000,
+    ".svg": 6_000,
+}
+CONTENT_TYPES = {
+    ".html": "text/html; charset=utf-8",
+    ".json": "application/json",
+    ".css": "text/css",
+    ".js": "application/javascript",
+    ".woff2": "font/woff2",
+    ".jpg": "image/jpeg",
+    ".png": "image/png",
+    ".svg": "image/svg+xml",
+}
+# operationName GraphQL -> réponse enregistrée
+GRAPHQL_FIXTURES = {
+    "PolicySearchStructuredScopesQuery": "graphql_structured_scopes.json",
+}
+DEFAULT_GRAPHQL_FIXTURE = "graphql_team_profile.json"
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """Sert les fixtures et des assets synthétiques en comptant les octets envoyés."""
+
+    bytes_sent = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        if path.startswith("/assets/"):
+            ext = Path(path).suffix
+            size = ASSET_SIZES.get(ext, 1_000)
+            # JS/CSS valides (commentaires), binaire arbitraire pour le reste
+            if ext in (".js", ".css"):
+                body = b"/*" + b"x" * (size - 4) + b"*/"
+            else:
+                body = b"\0" * size
+            self._send(body, CONTENT_TYPES.get(ext, "application/octet-stream"))
+        elif path == "/directory/programs":
+            self._send_fixture("directory.html")
+        elif path.endswith("/policy_scopes"):
+            self._send_fixture("policy_scopes.html")
+        else:
+            self._send_fixture("program.html")
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            query = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            query = {}
+        if self.path.split("?")[0] != "/graphql":
+            self.send_error(404)
+            return
+        name = GRAPHQL_FIXTURES.get(query.get("operationName"), DEFAULT_GRAPHQL_FIXTURE)
+        payload = json.loads((FIXTURES / name).read_text(encoding="utf-8"))
+        handle = (query.get("variables") or {}).get("handle")
+        if handle:
+            # le scraper vérifie que la réponse concerne le programme chargé
+            payload["data"]["team"]["handle"] = handle
+        self._send(json.dumps(payload).encode(), CONTENT_TYPES[".json"])
+
+    def _send_fixture(self, name):
+        self._send((FIXTURES / name).read_bytes(), CONTENT_TYPES[Path(name).suffix])
+
+    def _send(self, body, ctype):
+        self.send_response(200)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        # pas de cache : chaque page paie ses ressources, comme un premier chargement
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+        with FixtureHandler.lock:
+            FixtureHandler.bytes_sent += len(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server(scraper_module=None):
+    """
+    Démarre le serveur sur un port libre (thread daemon) et retourne (server, base_url).
+    Si `scraper_module` est fourni, ses URLs BASE / DIRECTORY_URL pointent vers le serveur.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    if scraper_module is not None:
+        scraper_module.BASE = base
+        scraper_module.DIRECTORY_URL = f"{base}/directory/programs"
+    return server, base
@@ -16,22 +16,69 @@ Ce script expose trois fonctions principales requises par l'exercice :
 
 # imports standard
 import re
+import gzip
 import json
 import time
+import hashlib
+import queue
+import asyncio
+import argparse
+from contextlib import contextmanager
+from datetime import datetime, timezone, timedelta
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterator, Iterable, Callable, Tuple
+from urllib.parse import urlparse
 
 # Playwright (synchronisé)
 from playwright.sync_api import sync_playwright, Page, TimeoutError as PWTimeout
+# Playwright (asynchrone) pour le mode concurrent
+from playwright.async_api import async_playwright, Page as AsyncPage
 
 # URL de la directory et constantes
 DIRECTORY_URL = "https://hackerone.com/directory/programs"
 BASE = "https://hackerone.com"
 OUTPUT = "programs.json"
+RAW_CACHE_DIR = "raw_cache"
 
 # Expressions régulières pour détecter domaines / urls
 DOMAIN_RE = re.compile(r"(?:\*\.)?(?:[A-Za-z0-9-]+\.)+[A-Za-z]{2,63}")
 URL_RE = re.compile(r"https?://[^\s'\"<>]+")
+# Classification des lignes de scope (compilées une seule fois, voir ScopeClassifier)
+URL_SCHEME_RE = re.compile(r"^https?://")
+URL_SCHEME_I_RE = re.compile(r"^https?://", re.I)
+DOMAIN_LINE_RE = re.compile(r"^(?:[\w\-]+\.)+[a-z]{2,}$")
+SCOPE_SKIP_RE = re.compile(r"\b(hackerone\.com|policy|support)\b", re.I)
+SCOPE_KEYS = ("domains", "urls", "wildcards")
+
+# Types de ressources chargées pendant le scraping (le reste est bloqué via page.route) :
+# la page est une SPA, il faut le document, les scripts et les appels XHR/fetch,
+# mais ni images, ni polices, ni feuilles de style, ni médias.
+ALLOWED_RESOURCE_TYPES = frozenset({"document", "script", "xhr", "fetch"})
+# Trackers / analytics bloqués même si leur type de ressource est autorisé
+BLOCKED_URL_RE = re.compile(
+    r"google-analytics|googletagmanager|doubleclick|facebook\.net|hotjar|segment\.(?:io|com)"
+    r"|optimizely|newrelic|nr-data|sentry|intercom|hs-scripts|clarity\.ms",
+    re.I,
+)
+
+# Routes internes de hackerone.com qui ne sont pas des programmes
+NON_PROGRAM_HANDLES = frozenset({"blog", "press", "privacy", "terms", "jobs", "docs", "help", "directory", "security"})
+
+# Mode d'extraction "network" : réponses JSON (GraphQL) contenant le scope structuré
+SCOPE_RESPONSE_RE = re.compile(r"/graphql|structured_scopes|policy_scopes", re.I)
+# asset_type HackerOne conservés (les apps mobiles, contrats, code source... sont ignorés)
+SCOPE_ASSET_TYPES = {"URL", "WILDCARD", "DOMAIN"}
+EXTRACT_MODES = ("dom", "network")
+# Champs de "dernière mise à jour" d'un programme dans les réponses JSON de la directory
+PROGRAM_MARKER_KEYS = ("last_updated_at", "updated_at", "last_policy_change_at")
+
+# Sélecteurs des blocs contenant les cibles du scope (ordre de priorité)
+SCOPE_SELECTORS = [
+    "section:has-text('In scope')",
+    "section:has-text('Eligible')",
+    "div:has-text('In scope')",
+    "div:has-text('Eligible')"
+]
 
 # ---------------------
 # Fonctions utilitaires
@@ -68,206 +115,1180 @@ def _classify_token(token: str):
         return None, None
     if "*" in t:
         return "wildcards", t
-    if re.match(r"^https?://", t, flags=re.I):
+    if URL_SCHEME_I_RE.match(t):
         return "urls", t
     m = DOMAIN_RE.search(t)
     if m:
         return "domains", m.group(0).lower()
     return None, None
 
+class ScopeClassifier:
+    """
+    Classifieur de cibles en une seule passe, avec des regex précompilées.
+    Les cibles sont rangées dans 'domains' / 'urls' / 'wildcards' via des ensembles
+    ordonnés (dict) : dédoublonnage en O(1), ordre d'apparition conservé.
+    Partagé par l'extraction DOM, le mode network et le re-parsing hors ligne.
+    """
+
+    def __init__(self):
+        self._out: Dict[str, Dict[str, None]] = {k: {} for k in SCOPE_KEYS}
+
+    @staticmethod
+    def classify_line(line: str) -> Optional[str]:
+        """Catégorie d'une ligne déjà strippée, ou None si ce n'est pas une cible."""
+        # ignorer les longues descriptions, et références internes hackerone
+        if len(line) > 150 or SCOPE_SKIP_RE.search(line):
+            return None
+        # heuristiques simples pour classer
+        if "*" in line:
+            return "wildcards"
+        if URL_SCHEME_RE.match(line):
+            return "urls"
+        if DOMAIN_LINE_RE.match(line):
+            return "domains"
+        return None
+
+    def add(self, key: str, value: str):
+        """Ajoute une cible déjà classée (ignorée si déjà présente)."""
+        self._out[key][value] = None
+
+    def feed_text(self, content: str) -> "ScopeClassifier":
+        """Classe le texte brut d'une section scope, ligne par ligne."""
+        out = self._out
+        classify = self.classify_line
+        for raw in content.splitlines():
+            line = raw.strip()
+            if not line:
+                continue
+            key = classify(line)
+            if key:
+                out[key][line] = None
+        return self
+
+    def result(self) -> Dict[str, List[str]]:
+        """Dict final au format programs.json (clés vides supprimées)."""
+        return {k: list(v) for k, v in self._out.items() if v}
+
+def _parse_scope_text(content: str) -> Dict[str, List[str]]:
+    """
+    Parse le texte brut d'une section scope ligne par ligne et le classe en
+    'domains', 'urls', 'wildcards' (clés vides supprimées).
+    """
+    return ScopeClassifier().feed_text(content).result()
+
+def _iter_scope_assets(obj):
+    """Parcourt récursivement un payload JSON et génère les dicts d'asset de scope."""
+    if isinstance(obj, dict):
+        if "asset_identifier" in obj and "asset_type" in obj:
+            yield obj
+            return
+        for v in obj.values():
+            yield from _iter_scope_assets(v)
+    elif isinstance(obj, list):
+        for v in obj:
+            yield from _iter_scope_assets(v)
+
+def _has_scope_data(obj) -> bool:
+    """Vrai si le payload contient une clé de scope structuré (même vide)."""
+    if isinstance(obj, dict):
+        return any("structured_scope" in k or _has_scope_data(v) for k, v in obj.items())
+    if isinstance(obj, list):
+        return any(_has_scope_data(v) for v in obj)
+    return False
+
+def _scope_from_payload(payload) -> Optional[Dict[str, List[str]]]:
+    """
+    Construit le dict domains/urls/wildcards à partir d'une réponse JSON/GraphQL du
+    frontend HackerOne (assets 'structured_scopes'). Seuls les assets éligibles à la
+    soumission (In scope) de type URL/WILDCARD/DOMAIN sont gardés.
+    Retourne None si le payload ne contient pas de scope.
+    """
+    if not _has_scope_data(payload):
+        return None
+    out = ScopeClassifier()
+    for asset in _iter_scope_assets(payload):
+        if asset.get("eligible_for_submission") is False:
+            continue
+        kind = str(asset.get("asset_type") or "").upper()
+        ident = str(asset.get("asset_identifier") or "").strip()
+        if kind not in SCOPE_ASSET_TYPES or not ident:
+            continue
+        # HackerOne range souvent de simples domaines sous le type "URL"
+        if kind == "WILDCARD" or "*" in ident:
+            out.add("wildcards", ident)
+        elif URL_SCHEME_I_RE.match(ident):
+            out.add("urls", ident)
+        else:
+            out.add("domains", ident)
+    return out.result()
+
+def _payload_team_handles(obj, found: Optional[set] = None) -> set:
+    """Handles d'équipe ("team": {"handle": ...}) présents dans un payload JSON."""
+    found = set() if found is None else found
+    if isinstance(obj, dict):
+        team = obj.get("team")
+        if isinstance(team, dict) and isinstance(team.get("handle"), str):
+            found.add(team["handle"].lower())
+        for v in obj.values():
+            _payload_team_handles(v, found)
+    elif isinstance(obj, list):
+        for v in obj:
+            _payload_team_handles(v, found)
+    return found
+
+def _request_handle(request) -> Optional[str]:
+    """
+    Handle visé par une requête : variables GraphQL ({"variables": {"handle": ...}})
+    ou premier segment du chemin (/audible/policy_scopes). None si inconnu.
+    """
+    try:
+        data = request.post_data_json
+    except Exception:
+        data = None
+    variables = data.get("variables") if isinstance(data, dict) else None
+    if isinstance(variables, dict) and isinstance(variables.get("handle"), str):
+        return variables["handle"].lower()
+    parts = urlparse(request.url).path.strip("/").split("/")
+    return parts[0].lower() if len(parts) > 1 else None
+
+def _is_program_response(payload, request, program_handle: str) -> bool:
+    """
+    Vrai si une réponse de scope concerne bien `program_handle` : les pages du pool
+    sont réutilisées, une réponse tardive du programme précédent ne doit pas être prise
+    pour ce scope. Le handle d'équipe du payload fait foi ; sans lui, celui de la requête.
+    """
+    teams = _payload_team_handles(payload)
+    if teams:
+        return program_handle.lower() in teams
+    return _request_handle(request) == program_handle.lower()
+
+def _iter_program_markers(obj):
+    """
+    Parcourt un payload JSON de la directory et génère (handle, marqueur de mise à jour)
+    pour chaque programme qui en expose un (voir PROGRAM_MARKER_KEYS).
+    """
+    if isinstance(obj, dict):
+        handle = obj.get("handle")
+        if isinstance(handle, str):
+            for key in PROGRAM_MARKER_KEYS:
+                if obj.get(key):
+                    yield handle.lower(), str(obj[key])
+                    break
+        for v in obj.values():
+            yield from _iter_program_markers(v)
+    elif isinstance(obj, list):
+        for v in obj:
+            yield from _iter_program_markers(v)
+
+def _scope_hash(scope: Dict[str, List[str]]) -> str:
+    """Empreinte stable d'un scope (indépendante de l'ordre des clés)."""
+    return hashlib.sha256(json.dumps(scope, sort_keys=True).encode("utf-8")).hexdigest()
+
+def _is_blocked_request(resource_type: str, url: str,
+                        allowed: Optional[Iterable[str]] = ALLOWED_RESOURCE_TYPES) -> bool:
+    """
+    Indique si une requête doit être interrompue : type de ressource hors de
+    l'allowlist ou URL de tracker connue. allowed=None désactive le blocage.
+    """
+    if allowed is None:
+        return False
+    return resource_type not in allowed or bool(BLOCKED_URL_RE.search(url))
+
+# ---------------------
+# Session navigateur partagée
+# ---------------------
+
+class ScraperSession:
+    """
+    Session Playwright réutilisable : le navigateur Chromium est lancé une seule fois
+    et un petit pool de pages (dans un même contexte) est recyclé entre les appels.
+
+    Usage :
+        with ScraperSession() as session:
+            handles = get_programs_list(session=session)
+            scope = get_scope("audible", session=session)
+
+    Remarque : l'API synchrone de Playwright n'est pas thread-safe, le pool sert à
+    réutiliser les pages (pas de cold start) et non à paralléliser.
+
+    `allowed_resources` : types de ressources autorisés (images, polices, CSS et
+    trackers sont bloqués par défaut) ; None pour tout charger.
+    """
+
+    def __init__(self, headless: bool = True, pool_size: int = 1,
+                 allowed_resources: Optional[Iterable[str]] = ALLOWED_RESOURCE_TYPES):
+        self.headless = headless
+        self.pool_size = max(1, pool_size)
+        self.allowed_resources = None if allowed_resources is None else frozenset(allowed_resources)
+        self._pw = None
+        self._browser = None
+        self._ctx = None
+        self._pages: "queue.Queue[Page]" = queue.Queue()
+
+    def start(self) -> "ScraperSession":
+        """Lance Playwright, le navigateur et prépare le pool de pages."""
+        if self._browser is not None:
+            return self
+        self._pw = sync_playwright().start()
+        self._browser = self._pw.chromium.launch(headless=self.headless)
+        self._ctx = self._browser.new_context()
+        if self.allowed_resources is not None:
+            self._ctx.route("**/*", self._filter_route)
+        for _ in range(self.pool_size):
+            self._pages.put(self._ctx.new_page())
+        return self
+
+    def close(self):
+        """Ferme le contexte, le navigateur et arrête Playwright."""
+        try:
+            if self._ctx is not None:
+                self._ctx.close()
+            if self._browser is not None:
+                self._browser.close()
+        finally:
+            if self._pw is not None:
+                self._pw.stop()
+            self._pw = self._browser = self._ctx = None
+            self._pages = queue.Queue()
+
+    def _filter_route(self, route):
+        """Handler page.route : interrompt les ressources inutiles au scraping."""
+        req = route.request
+        if _is_blocked_request(req.resource_type, req.url, self.allowed_resources):
+            route.abort()
+        else:
+            route.continue_()
+
+    def __enter__(self) -> "ScraperSession":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @contextmanager
+    def page(self, timeout: int = 20) -> Iterator[Page]:
+        """
+        Emprunte une page du pool (avec le timeout par défaut donné, en secondes)
+        et la rend au pool à la sortie. Une page fermée/cassée est remplacée.
+        """
+        if self._browser is None:
+            self.start()
+        page = self._pages.get()
+        try:
+            page.set_default_timeout(timeout * 1000)
+            yield page
+        finally:
+            if page.is_closed():
+                page = self._ctx.new_page()
+            self._pages.put(page)
+
+
+@contextmanager
+def _use_session(session: Optional[ScraperSession], **kwargs) -> Iterator[ScraperSession]:
+    """
+    Réutilise la session fournie, sinon en ouvre une temporaire (fermée à la sortie)
+    construite avec `kwargs`.
+    """
+    if session is not None:
+        yield session
+        return
+    with ScraperSession(**kwargs) as tmp:
+        yield tmp
+
+# ---------------------
+# Checkpoint / reprise
+# ---------------------
+
+def _default_journal_path(save_path: str) -> str:
+    """programs.json -> programs.checkpoint.jsonl (même dossier)."""
+    return str(Path(save_path).with_suffix(".checkpoint.jsonl"))
+
+class CheckpointJournal:
+    """
+    Journal append-only (JSONL) des scopes récupérés, flushé après chaque handle.
+    Lignes possibles :
+        {"handles": [...]}                    liste des handles du run
+        {"handle": "audible", "scope": {...}}  un programme terminé
+    Une dernière ligne tronquée (crash pendant l'écriture) est retirée du fichier au
+    chargement : l'enregistrement suivant repart sur une ligne neuve, et le handle
+    concerné est simplement re-scrapé.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.has_handles = False
+        self.markers: Dict[str, str] = {}
+
+    def reset(self):
+        """Vide le journal (nouveau run)."""
+        self.path.write_text("")
+        self.has_handles = False
+
+    def load(self) -> Tuple[Optional[List[str]], Dict[str, Dict[str, List[str]]]]:
+        """Relit le journal : (liste des handles ou None, {handle: scope} déjà faits)."""
+        handles, done = None, {}
+        if not self.path.exists():
+            return handles, done
+        data = self.path.read_bytes()
+        complete = data[:data.rfind(b"\n") + 1]
+        if len(complete) < len(data):
+            # sans troncature, le prochain _append écrirait à la suite de la ligne
+            # tronquée et rendrait aussi cet enregistrement illisible
+            with self.path.open("r+b") as f:
+                f.truncate(len(complete))
+        for line in complete.decode("utf-8").splitlines():
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if "handles" in entry:
+                handles = entry["handles"]
+                self.markers = entry.get("markers") or {}
+            elif "handle" in entry:
+                done[entry["handle"]] = entry.get("scope") or {}
+        self.has_handles = handles is not None
+        return handles, done
+
+    def _append(self, entry: dict):
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            f.flush()
+
+    def record_handles(self, handles: List[str], markers: Optional[Dict[str, str]] = None):
+        """
+        Enregistre la liste des handles et leurs marqueurs de mise à jour
+        (évite de re-crawler la directory en reprise).
+        """
+        self._append({"handles": list(handles), "markers": markers or {}})
+        self.has_handles = True
+        self.markers = markers or {}
+
+    def record(self, handle: str, scope: Dict[str, List[str]]):
+        """Ajoute le scope d'un handle terminé."""
+        self._append({"handle": handle, "scope": scope})
+
+# Dernière ligne de programs.ndjson : le run est terminé (les lecteurs qui suivent le
+# fichier s'arrêtent dessus au lieu d'attendre un délai d'inactivité)
+NDJSON_END = {"end": True}
+
+def _default_ndjson_path(save_path: str) -> str:
+    """programs.json -> programs.ndjson (sortie en flux, un programme par ligne)."""
+    return str(Path(save_path).with_suffix(".ndjson"))
+
+def _append_ndjson(path: str, handle: str, scope: Dict[str, List[str]]):
+    """Ajoute un programme au flux NDJSON : {"handle": ..., "scope": {...}} (flushé)."""
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"handle": handle, "scope": scope}, ensure_ascii=False) + "\n")
+        f.flush()
+
+def _write_ndjson(path: str, aggregated: Dict[str, Dict[str, List[str]]]):
+    """Réécrit entièrement le flux NDJSON à partir d'une agrégation, ligne de fin comprise."""
+    tmp = Path(path).with_suffix(".tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        for h, scope in aggregated.items():
+            f.write(json.dumps({"handle": h, "scope": scope}, ensure_ascii=False) + "\n")
+        f.write(json.dumps(NDJSON_END) + "\n")
+    tmp.replace(path)
+
+def compact_journal(journal_path: str, save_path: str = OUTPUT,
+                    handles: Optional[List[str]] = None,
+                    base: Optional[Dict[str, Dict[str, List[str]]]] = None):
+    """
+    Compacte un journal de checkpoint en programs.json (dernière entrée gagnante par
+    handle, dans l'ordre de `handles` si fourni) puis supprime le journal.
+    `base` fournit le scope des handles non re-scrapés (mode incrémental).
+    """
+    journal = CheckpointJournal(journal_path)
+    saved_handles, done = journal.load()
+    order = handles or saved_handles or list(done)
+    base = base or {}
+    aggregated = {h: done[h] if h in done else base[h] for h in order if h in done or h in base}
+    # handles présents dans le journal mais hors de la liste : gardés à la fin
+    aggregated.update({h: v for h, v in done.items() if h not in aggregated})
+    result = _save_programs(aggregated, save_path)
+    journal.path.unlink()
+    return result
+
+# ---------------------
+# Re-scrape incrémental
+# ---------------------
+
+def _default_meta_path(save_path: str) -> str:
+    """programs.json -> programs.meta.json (métadonnées par handle)."""
+    return str(Path(save_path).with_suffix(".meta.json"))
+
+def _load_json(path: str) -> dict:
+    """Charge un fichier JSON, {} s'il est absent."""
+    p = Path(path)
+    return json.loads(p.read_text(encoding="utf-8")) if p.exists() else {}
+
+def _unchanged_handles(handles: List[str], markers: Dict[str, str],
+                       previous: Dict[str, Dict[str, List[str]]], meta: Dict[str, dict],
+                       max_age_days: Optional[float] = None) -> set:
+    """
+    Handles dont le scope précédent peut être réutilisé tel quel :
+    - le marqueur de mise à jour de la directory est identique à celui enregistré, ou
+    - (sans marqueur) le dernier fetch date de moins de `max_age_days` jours.
+    Les nouveaux handles et ceux sans information sont toujours re-scrapés.
+    """
+    now = datetime.now(timezone.utc)
+    unchanged = set()
+    for h in handles:
+        info = meta.get(h)
+        if h not in previous or not info:
+            continue
+        if markers.get(h) is not None:
+            if markers[h] == info.get("updated"):
+                unchanged.add(h)
+        elif max_age_days is not None and info.get("fetched_at"):
+            fetched = datetime.fromisoformat(info["fetched_at"])
+            if now - fetched < timedelta(days=max_age_days):
+                unchanged.add(h)
+    return unchanged
+
+def diff_programs(old: Dict[str, Dict[str, List[str]]],
+                  new: Dict[str, Dict[str, List[str]]]) -> Dict[str, object]:
+    """
+    Rapport de différences entre deux programs.json :
+    programmes ajoutés / supprimés et, pour les autres, cibles ajoutées / retirées
+    par catégorie.
+    """
+    report = {
+        "added_programs": sorted(h for h in new if h not in old),
+        "removed_programs": sorted(h for h in old if h not in new),
+        "changed": {},
+    }
+    for h in new:
+        if h not in old:
+            continue
+        change = {"added": {}, "removed": {}}
+        for key in set(old[h]) | set(new[h]):
+            before, after = set(old[h].get(key, [])), set(new[h].get(key, []))
+            if after - before:
+                change["added"][key] = sorted(after - before)
+            if before - after:
+                change["removed"][key] = sorted(before - after)
+        if change["added"] or change["removed"]:
+            report["changed"][h] = change
+    return report
+
+def _write_meta(meta_path: str, aggregated: Dict[str, Dict[str, List[str]]],
+                fetched: set, markers: Dict[str, str], old_meta: Dict[str, dict]):
+    """Met à jour les métadonnées par handle (hash du scope, marqueur, date du fetch)."""
+    now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    meta = {}
+    for h, scope in aggregated.items():
+        if h in fetched or h not in old_meta:
+            meta[h] = {"hash": _scope_hash(scope), "updated": markers.get(h), "fetched_at": now}
+        else:
+            meta[h] = dict(old_meta[h], updated=markers.get(h, old_meta[h].get("updated")))
+    Path(meta_path).write_text(json.dumps(meta, indent=4, ensure_ascii=False))
+
+# ---------------------
+# Cache des pages brutes (re-parsing hors ligne)
+# ---------------------
+
+class RawScopeCache:
+    """
+    Cache disque compressé (gzip) des captures brutes de scope, un fichier par handle :
+        raw_cache/<handle>.json.gz -> {"handle", "mode", "fetched_at", "text", "html", "payload"}
+    - mode "dom"     : texte (et HTML) de la section scope rendue
+    - mode "network" : payload JSON contenant le scope structuré
+    Permet de relancer la classification sans navigateur (voir reparse_cache).
+    create=False ouvre le cache en lecture seule (le dossier n'est pas créé).
+    """
+
+    def __init__(self, directory: str = RAW_CACHE_DIR, create: bool = True):
+        self.dir = Path(directory)
+        if create:
+            self.dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, handle: str) -> Path:
+        return self.dir / f"{handle}.json.gz"
+
+    def put(self, handle: str, mode: str, text: str = "", html: str = "", payload=None):
+        """Enregistre (ou remplace) la capture brute d'un handle."""
+        entry = {
+            "handle": handle,
+            "mode": mode,
+            "fetched_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "text": text,
+            "html": html,
+            "payload": payload,
+        }
+        tmp = self._path(handle).with_suffix(".tmp")
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        tmp.replace(self._path(handle))
+
+    def get(self, handle: str) -> Optional[dict]:
+        """Capture brute d'un handle, ou None si absente / illisible."""
+        try:
+            with gzip.open(self._path(handle), "rt", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def handles(self) -> List[str]:
+        """Handles présents dans le cache (triés)."""
+        return sorted(p.name[:-len(".json.gz")] for p in self.dir.glob("*.json.gz"))
+
+def _scope_from_raw(entry: dict) -> Dict[str, List[str]]:
+    """Re-classe une capture brute du cache avec les heuristiques courantes."""
+    if entry.get("mode") == "network":
+        return _scope_from_payload(entry.get("payload")) or {}
+    return _parse_scope_text(entry.get("text") or "")
+
+def reparse_cache(cache_dir: str = RAW_CACHE_DIR, save_path: str = OUTPUT,
+                  handles: Optional[List[str]] = None):
+    """
+    Mode hors ligne : régénère programs.json en re-classant les captures du cache,
+    sans lancer de navigateur ni toucher HackerOne.
+    Si le dossier du cache n'existe pas ou qu'aucune capture n'est lue, rien n'est
+    écrit (programs.json n'est pas écrasé par un résultat vide) et None est retourné.
+    """
+    cache = RawScopeCache(cache_dir, create=False)
+    if not cache.dir.is_dir():
+        print(f"[!] Cache directory not found: {cache.dir} (nothing written)")
+        return None
+    handles = handles or cache.handles()
+    print(f"[*] Re-parsing {len(handles)} cached programs from {cache.dir} ...")
+    aggregated = {}
+    for h in handles:
+        entry = cache.get(h)
+        if entry is None:
+            print(f"[!] {h}: not in cache")
+            continue
+        aggregated[h] = _scope_from_raw(entry)
+    if not aggregated:
+        print(f"[!] No cached programs in {cache.dir} (nothing written)")
+        return None
+    _write_ndjson(_default_ndjson_path(save_path), aggregated)
+    return _save_programs(aggregated, save_path)
+
 # ---------------------
 # Fonctions demandées
 # ---------------------
 
-def get_programs_list(timeout: int = 30) -> List[str]:
+# JS exécuté dans la page de la directory : compteur de mutations du DOM
+_DIRECTORY_OBSERVER_JS = """() => {
+    if (window.__h1Directory) return;
+    window.__h1Directory = {mutations: 0};
+    new MutationObserver(records => { window.__h1Directory.mutations += records.length; })
+        .observe(document.body, {childList: true, subtree: true});
+}"""
+# ancres relatives pas encore vues -> [[href, dans_une_carte_de_programme], ...]
+_DIRECTORY_COLLECT_JS = """() => {
+    const out = [];
+    for (const a of document.querySelectorAll("a[href^='/']:not([data-h1-seen])")) {
+        a.setAttribute("data-h1-seen", "");
+        out.push([a.getAttribute("href") || "", !!a.closest("[data-testid*='program-card']")]);
+    }
+    return out;
+}"""
+# scroll en bas de page, retourne le compteur de mutations avant le scroll
+_DIRECTORY_SCROLL_JS = """() => {
+    const n = window.__h1Directory.mutations;
+    window.scrollTo(0, document.body.scrollHeight);
+    return n;
+}"""
+
+def _add_directory_handles(handles: set, found: List[List]):
+    """Ajoute à `handles` les handles des [href, is_card] remontés par _DIRECTORY_COLLECT_JS."""
+    for href, is_card in found:
+        h = _handle_from_href(href)
+        if not h:
+            continue
+        # filtrer des routes internes évidentes (non programmes), sauf cartes de programme
+        if not is_card and h in NON_PROGRAM_HANDLES:
+            continue
+        handles.add(h)
+
+def get_programs_list(timeout: int = 30, session: Optional[ScraperSession] = None,
+                      markers: Optional[Dict[str, str]] = None) -> List[str]:
     """
     Retourne la liste des handles (chaînes) présents dans la page /directory/programs.
     Utilise Playwright pour rendre la page et effectue un scroll pour charger le contenu.
+    Si `session` est fournie, le navigateur de la session est réutilisé.
+    Si `markers` (dict) est fourni, il est rempli avec {handle: marqueur de mise à jour}
+    lus dans les réponses JSON de la directory (utilisé par le mode incrémental).
+    """
+    with _use_session(session) as s, s.page(timeout) as page:
+        result = _collect_program_handles(page, markers)
+    print(f"[+] Found {len(result)} program handles.")
+    return result
+
+def _collect_program_handles(page: Page, markers: Optional[Dict[str, str]] = None,
+                             idle_timeout: float = 1.0) -> List[str]:
+    """
+    Parcourt la directory sur une page déjà ouverte et retourne les handles triés.
+
+    Chaque passe fait un seul page.evaluate qui ne remonte que les ancres pas encore
+    vues (marquées côté navigateur). Après chaque scroll, on attend qu'un
+    MutationObserver signale du nouveau contenu (au plus `idle_timeout` secondes)
+    au lieu de dormir un temps fixe. Une seule attente sans mutation suffit à conclure
+    à la fin de liste, sauf si une requête GraphQL de la directory (page suivante)
+    est encore en cours : on scrolle et on attend alors à nouveau.
     """
     handles = set()
-    with sync_playwright() as p:
-        # lancement d'un navigateur Chromium headless
-        browser = p.chromium.launch(headless=True)
-        ctx = browser.new_context()
-        page = ctx.new_page()
-        page.set_default_timeout(timeout * 1000)
-
-        # aller sur la page de la directory
-        page.goto(DIRECTORY_URL)
-        # petit délai pour débuter le rendu/js
-        time.sleep(1.0)
-
-        # boucle de scroll pour charger le contenu (infinite scroll)
-        prev = 0
-        stable = 0
-        for i in range(80):
-            # recherche de tous les ancres relatives
-            anchors = page.query_selector_all("a[href^='/']")
-            for a in anchors:
-                try:
-                    href = a.get_attribute("href") or ""
-                except Exception:
-                    href = ""
-                h = _handle_from_href(href)
-                if h:
-                    # filtrer des routes internes évidentes (non programmes)
-                    if h in {"blog", "press", "privacy", "terms", "jobs", "docs", "help", "directory", "security"}:
-                        continue
-                    handles.add(h)
-            # descendre en bas de la page pour forcer le chargement
-            page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-            time.sleep(0.35)
-            # si stable (plus de nouveaux handles) plusieurs fois, sortir
-            if len(handles) == prev:
-                stable += 1
-            else:
-                stable = 0
-            prev = len(handles)
-            if stable >= 4:
-                break
 
-        # tentative finale : chercher des éléments marqués data-testid de cartes de programme
+    # requêtes GraphQL de la directory encore en cours (page de résultats en route)
+    inflight = set()
+
+    def on_request(req):
+        if SCOPE_RESPONSE_RE.search(req.url):
+            inflight.add(req)
+
+    on_request_done = inflight.discard
+    page.on("request", on_request)
+    page.on("requestfinished", on_request_done)
+    page.on("requestfailed", on_request_done)
+
+    # réponses JSON de la directory (marqueurs de mise à jour des programmes)
+    responses = []
+    on_response = responses.append
+    if markers is not None:
+        page.on("response", on_response)
+
+    # aller sur la page de la directory, puis attendre les premières ancres
+    page.goto(DIRECTORY_URL)
+    try:
+        page.wait_for_selector("a[href^='/']", timeout=10000)
+    except PWTimeout:
+        pass
+    page.evaluate(_DIRECTORY_OBSERVER_JS)
+
+    # boucle de scroll pour charger le contenu (infinite scroll)
+    stable = 0
+    for i in range(80):
+        # une seule évaluation : nouvelles ancres + indicateur "carte de programme"
+        before = len(handles)
+        _add_directory_handles(handles, page.evaluate(_DIRECTORY_COLLECT_JS))
+        stable = stable + 1 if len(handles) == before else 0
+
+        # descendre en bas de la page puis attendre une mutation du DOM
+        mutations = page.evaluate(_DIRECTORY_SCROLL_JS)
         try:
-            cards = page.query_selector_all("[data-testid*='program-card'] a[href^='/']")
-            for a in cards:
-                href = a.get_attribute("href") or ""
-                h = _handle_from_href(href)
-                if h:
-                    handles.add(h)
-        except Exception:
-            pass
+            page.wait_for_function("n => window.__h1Directory.mutations > n", arg=mutations,
+                                   timeout=idle_timeout * 1000)
+        except PWTimeout:
+            # plus rien ne se charge et aucune page de résultats en route : fin de liste
+            if not inflight:
+                break
+        # des mutations sans nouveaux programmes : sortir aussi
+        if stable >= 4:
+            break
 
-        ctx.close()
-        browser.close()
+    # dernière collecte après le dernier scroll
+    _add_directory_handles(handles, page.evaluate(_DIRECTORY_COLLECT_JS))
+    page.remove_listener("request", on_request)
+    page.remove_listener("requestfinished", on_request_done)
+    page.remove_listener("requestfailed", on_request_done)
 
-    result = sorted(handles)
-    print(f"[+] Found {len(result)} program handles.")
-    return result
+    if markers is not None:
+        page.remove_listener("response", on_response)
+        for resp in responses:
+            if not SCOPE_RESPONSE_RE.search(resp.url):
+                continue
+            try:
+                payload = resp.json()
+            except Exception:
+                continue
+            markers.update((h, m) for h, m in _iter_program_markers(payload) if h in handles)
+
+    return sorted(handles)
 
-def get_scope(program_handle: str, timeout: int = 20) -> Dict[str, List[str]]:
+def get_scope(program_handle: str, timeout: int = 20, session: Optional[ScraperSession] = None,
+              mode: str = "dom", cache: Optional[RawScopeCache] = None) -> Dict[str, List[str]]:
     """
     Pour un handle donné, ouvre la page du programme et essaye d'extraire les cibles
     marquées 'In scope' ou 'Eligible'. Retourne un dict pouvant contenir les clés :
     'domains', 'urls', 'wildcards'.
+    Si `session` est fournie, une page de son pool est réutilisée (pas de relance du navigateur).
+
+    mode="dom" (défaut) : lecture du texte rendu de la section scope.
+    mode="network" : écoute les réponses réseau de la page (page.on("response")) et
+    parse le scope structuré reçu par le frontend, sans scraping du DOM.
+    Si `cache` est fourni, la capture brute (texte/HTML ou payload JSON) y est enregistrée.
 
     Remarque : cette extraction est heuristique — HackerOne charge souvent du contenu
     par JS, il peut être nécessaire d'ajuster les sélecteurs si la page change.
     """
-    from playwright.sync_api import sync_playwright, TimeoutError as PWTimeout
-    import re, time
+    if mode not in EXTRACT_MODES:
+        raise ValueError(f"mode inconnu : {mode!r} (attendu : {', '.join(EXTRACT_MODES)})")
+    with _use_session(session) as s, s.page(timeout) as page:
+        if mode == "network":
+            return _capture_scope(page, program_handle, timeout, cache)
+        return _scrape_scope(page, program_handle, cache)
 
-    BASE = "https://hackerone.com"
-    # structure par défaut
-    out = {"domains": [], "urls": [], "wildcards": []}
+def _capture_scope(page: Page, program_handle: str, timeout: int = 20,
+                   cache: Optional[RawScopeCache] = None) -> Dict[str, List[str]]:
+    """
+    Mode "network" : charge la page des scopes et attend la réponse JSON contenant
+    le scope structuré (aucune attente de sélecteur ni lecture du texte rendu).
+    Seules les réponses de ce programme sont gardées (voir _is_program_response).
+    """
+    url = f"{BASE}/{program_handle}/policy_scopes"
+    captured = []
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        ctx = browser.new_context()
-        page = ctx.new_page()
-        page.set_default_timeout(timeout * 1000)
+    def on_response(resp):
+        # pas d'appel bloquant dans le handler : on garde la réponse pour plus tard
+        if SCOPE_RESPONSE_RE.search(resp.url):
+            captured.append(resp)
 
-        url = f"{BASE}/{program_handle}"
+    page.on("response", on_response)
+    try:
         try:
-            # charger la page — wait_until DOMContentLoaded pour démarrer rapidement
-            page.goto(url, wait_until="domcontentloaded")
+            page.goto(url, wait_until="commit")
         except PWTimeout:
             print(f"[!] Timeout loading {url}")
-            ctx.close()
-            browser.close()
             return {}
+        deadline = time.monotonic() + timeout
+        seen = 0
+        while True:
+            while seen < len(captured):
+                resp = captured[seen]
+                seen += 1
+                try:
+                    payload = resp.json()
+                except Exception:
+                    continue
+                if not _is_program_response(payload, resp.request, program_handle):
+                    continue
+                scope = _scope_from_payload(payload)
+                if scope is not None:
+                    if cache is not None:
+                        cache.put(program_handle, "network", payload=payload)
+                    return scope
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return {}
+            try:
+                page.wait_for_event("response", timeout=remaining * 1000)
+            except PWTimeout:
+                return {}
+    finally:
+        page.remove_listener("response", on_response)
 
-        # --- essayer de cliquer/ouvrir l'onglet "Scope" si présent ---
+def _scrape_scope(page: Page, program_handle: str,
+                  cache: Optional[RawScopeCache] = None) -> Dict[str, List[str]]:
+    """Extrait le scope d'un programme sur une page déjà ouverte (voir get_scope)."""
+    url = f"{BASE}/{program_handle}"
+    try:
+        # charger la page — wait_until DOMContentLoaded pour démarrer rapidement
+        page.goto(url, wait_until="domcontentloaded")
+    except PWTimeout:
+        print(f"[!] Timeout loading {url}")
+        return {}
+
+    # --- essayer de cliquer/ouvrir l'onglet "Scope" si présent ---
+    try:
+        # quelques libellés possibles pour l'onglet scope
+        page.wait_for_selector("text=Scope", timeout=5000)
         try:
-            # quelques libellés possibles pour l'onglet scope
-            page.wait_for_selector("text=Scope", timeout=5000)
-            try:
-                page.click("text=Scope", timeout=3000)
-                page.wait_for_timeout(1000)
-            except Exception:
-                # si le click échoue, on continue — le texte peut déjà être visible
-                pass
+            page.click("text=Scope", timeout=3000)
+            page.wait_for_timeout(1000)
         except Exception:
-            # pas d'onglet scope détecté rapidement, pas grave on continue
+            # si le click échoue, on continue — le texte peut déjà être visible
             pass
+    except Exception:
+        # pas d'onglet scope détecté rapidement, pas grave on continue
+        pass
 
-        # chercher une section qui contient 'In scope' ou 'Eligible'
-        selectors = [
-            "section:has-text('In scope')",
-            "section:has-text('Eligible')",
-            "div:has-text('In scope')",
-            "div:has-text('Eligible')"
-        ]
-        content = ""
-        for sel in selectors:
-            try:
-                sec = page.locator(sel)
-                if sec.count() > 0:
-                    # prendre le texte brut du premier bloc trouvé
-                    content = sec.first.inner_text()
-                    break
-            except Exception:
-                pass
-
-        # si rien trouvé, fallback : texte intégral de la page
-        if not content:
-            content = page.inner_text("body")
-
-        # --- nettoyer / parser le texte ligne par ligne pour extraire targets ---
-        lines = [x.strip() for x in content.splitlines() if x.strip()]
-        for line in lines:
-            # ignorer les longues descriptions, et références internes hackerone
-            if len(line) > 150:
-                continue
-            if re.search(r"\b(hackerone\.com|policy|support)\b", line, re.I):
-                continue
-
-            # heuristiques simples pour classer
-            if "*" in line:
-                if line not in out["wildcards"]:
-                    out["wildcards"].append(line)
-            elif re.match(r"^https?://", line):
-                if line not in out["urls"]:
-                    out["urls"].append(line)
-            elif re.match(r"^(?:[\w\-]+\.)+[a-z]{2,}$", line):
-                if line not in out["domains"]:
-                    out["domains"].append(line)
+    # chercher une section qui contient 'In scope' ou 'Eligible'
+    content = ""
+    block = None
+    for sel in SCOPE_SELECTORS:
+        try:
+            sec = page.locator(sel)
+            if sec.count() > 0:
+                # prendre le texte brut du premier bloc trouvé
+                block = sec.first
+                content = block.inner_text()
+                break
+        except Exception:
+            pass
 
-        # supprimer les clés vides pour ne garder que ce qui existe
-        out = {k: v for k, v in out.items() if v}
+    # si rien trouvé, fallback : texte intégral de la page
+    if not content:
+        block = page.locator("body")
+        content = page.inner_text("body")
 
-        ctx.close()
-        browser.close()
+    if cache is not None:
+        try:
+            html = block.inner_html()
+        except Exception:
+            html = ""
+        cache.put(program_handle, "dom", text=content, html=html)
 
-    return out
+    return _parse_scope_text(content)
 
-def scrape_hackerone(save_path: str = OUTPUT, handles: Optional[List[str]] = None):
+def scrape_hackerone(save_path: str = OUTPUT, handles: Optional[List[str]] = None,
+                     session: Optional[ScraperSession] = None, concurrency: int = 1,
+                     rate: float = 4.0,
+                     allowed_resources: Optional[Iterable[str]] = ALLOWED_RESOURCE_TYPES,
+                     mode: str = "dom", resume: bool = False,
+                     journal_path: Optional[str] = None, previous: Optional[str] = None,
+                     max_age_days: Optional[float] = None,
+                     cache_dir: Optional[str] = RAW_CACHE_DIR, ndjson: bool = True):
     """
     Orchestrateur principal :
     - si handles n'est pas fourni, appelle get_programs_list() pour récupérer tous les handles
     - pour chaque handle, appelle get_scope(handle)
     - agrège les résultats et écrit programs.json
+    Un seul navigateur est lancé pour tout le run (ou celui de `session` est réutilisé).
+
+    Si concurrency > 1, les scopes sont récupérés en parallèle par `concurrency` pages
+    (API async de Playwright) et `rate` limite le nombre de requêtes/seconde par hôte
+    (remplace le délai fixe entre deux handles).
+
+    `allowed_resources` : allowlist des types de ressources chargés (None = tout charger),
+    ignorée si une `session` déjà configurée est fournie.
+    `mode` : extraction "dom" (texte rendu) ou "network" (réponses JSON), voir get_scope.
+
+    Chaque scope est ajouté au journal de checkpoint (JSONL, `journal_path`, par défaut
+    à côté de `save_path`) dès qu'il est récupéré. Avec resume=True, les handles déjà
+    présents dans le journal sont sautés. En fin de run, le journal est compacté en
+    programs.json puis supprimé.
+
+    Mode incrémental (`previous` = chemin d'un programs.json précédent) : seuls les
+    programmes nouveaux ou modifiés (marqueur de mise à jour différent dans la directory,
+    ou fetch plus vieux que `max_age_days` quand aucun marqueur n'est exposé) sont
+    re-scrapés ; les autres reprennent leur scope précédent. Un rapport des cibles
+    ajoutées / retirées est écrit dans programs.diff.json.
+    Dans tous les cas, programs.meta.json garde le hash et la date de chaque scope.
+
+    `cache_dir` : dossier du cache compressé des captures brutes (None pour désactiver),
+    réutilisable hors ligne avec reparse_cache().
+
+    `ndjson` : émet aussi programs.ndjson, un programme par ligne ({"handle", "scope"}),
+    écrit au fil du crawl : les consommateurs (extract_domains) peuvent le lire en flux
+    sans attendre la fin du run ni charger tout le fichier. Le fichier est vidé au début
+    de chaque nouveau run, réécrit à partir de programs.json à la fin, et se termine par
+    la ligne NDJSON_END.
     """
-    if handles is None:
-        handles = get_programs_list()
-    print(f"[*] Scraping {len(handles)} programs...")
-    aggregated = {}
-    for i, h in enumerate(handles, start=1):
-        print(f"[{i}/{len(handles)}] {h} ...", end=" ", flush=True)
-        scope = get_scope(h)
-        if scope:
-            aggregated[h] = scope
-            print(f"found {', '.join(f'{k}:{len(v)}' for k,v in scope.items())}")
+    cache = RawScopeCache(cache_dir) if cache_dir else None
+    meta_path = _default_meta_path(save_path)
+    old_programs = _load_json(previous) if previous else {}
+    old_meta = _load_json(_default_meta_path(previous)) if previous else _load_json(meta_path)
+    journal = CheckpointJournal(journal_path or _default_journal_path(save_path))
+    done: Dict[str, Dict[str, List[str]]] = {}
+    markers: Dict[str, str] = {}
+    if resume:
+        saved_handles, done = journal.load()
+        markers = journal.markers
+        if handles is None:
+            handles = saved_handles
+        print(f"[*] Resuming from {journal.path}: {len(done)} programs already done.")
+    else:
+        journal.reset()
+
+    # flux NDJSON : créé (ou vidé) dès le début du run, avant le crawl de la directory,
+    # pour les lecteurs qui le suivent. Il n'est conservé que pour une reprise dont le
+    # journal a encore sa liste de handles (sinon, nouveau crawl : nouveau flux).
+    ndjson_path = _default_ndjson_path(save_path) if ndjson else None
+    fresh = not journal.has_handles
+    if ndjson_path:
+        if fresh:
+            Path(ndjson_path).write_text("")
         else:
-            # garder une clé vide pour indiquer qu'on a tenté
-            aggregated[h] = {}
-            print("none")
-        # petit délai pour être poli et limiter la charge
-        time.sleep(0.25)
+            Path(ndjson_path).touch()
+
+    if handles is None:
+        with _use_session(session, allowed_resources=allowed_resources) as s:
+            handles = get_programs_list(session=s, markers=markers)
+    if not resume or not journal.has_handles:
+        journal.record_handles(handles, markers)
+
+    unchanged = set()
+    if previous:
+        unchanged = _unchanged_handles(handles, markers, old_programs, old_meta, max_age_days)
+        print(f"[*] Incremental: {len(unchanged)} unchanged, {len(handles) - len(unchanged)} to fetch.")
+    todo = [h for h in handles if h not in done and h not in unchanged]
+
+    # flux NDJSON : chaque scope est ajouté dès qu'il est connu
+    if ndjson_path and fresh:
+        for h in handles:
+            if h in unchanged:
+                _append_ndjson(ndjson_path, h, old_programs[h])
+
+    def on_result(h: str, scope: Dict[str, List[str]]):
+        journal.record(h, scope)
+        if ndjson_path:
+            _append_ndjson(ndjson_path, h, scope)
+
+    if concurrency > 1:
+        print(f"[*] Scraping {len(todo)} programs ({concurrency} pages, {rate:g} req/s/host)...")
+        asyncio.run(scrape_scopes_async(todo, concurrency=concurrency, rate=rate,
+                                        allowed_resources=allowed_resources, mode=mode,
+                                        on_result=on_result, cache=cache))
+    else:
+        with _use_session(session, allowed_resources=allowed_resources) as s:
+            print(f"[*] Scraping {len(todo)} programs...")
+            for i, h in enumerate(todo, start=1):
+                print(f"[{i}/{len(todo)}] {h} ...", end=" ", flush=True)
+                scope = get_scope(h, session=s, mode=mode, cache=cache)
+                on_result(h, scope)
+                print(_scope_summary(scope))
+                # petit délai pour être poli et limiter la charge
+                time.sleep(0.25)
+
+    # compaction : journal -> programs.json (ordre des handles conservé)
+    base = {h: old_programs[h] for h in unchanged}
+    aggregated = compact_journal(journal.path, save_path, handles, base=base)
+    if ndjson_path:
+        # réécrit depuis l'agrégation finale (un crash entre le journal et le flux ne
+        # laisse pas de programme manquant), puis ligne de fin
+        _write_ndjson(ndjson_path, aggregated)
+    _write_meta(meta_path, aggregated, set(aggregated) - unchanged, markers, old_meta)
+
+    if previous:
+        report = diff_programs(old_programs, aggregated)
+        diff_path = Path(save_path).with_suffix(".diff.json")
+        diff_path.write_text(json.dumps(report, indent=4, ensure_ascii=False))
+        print(f"[+] Diff: +{len(report['added_programs'])} / -{len(report['removed_programs'])} programs, "
+              f"{len(report['changed'])} changed -> {diff_path}")
+    return aggregated
+
+def _scope_summary(scope: Dict[str, List[str]]) -> str:
+    """Résumé court d'un scope pour les logs ('domains:1, urls:2' ou 'none')."""
+    if not scope:
+        return "none"
+    return f"found {', '.join(f'{k}:{len(v)}' for k,v in scope.items())}"
+
+def _save_programs(aggregated: Dict[str, Dict[str, List[str]]], save_path: str):
+    """Écrit l'agrégation au format programs.json et la retourne."""
     # écrire le JSON final
     Path(save_path).write_text(json.dumps(aggregated, indent=4, ensure_ascii=False))
     print(f"[+] Saved {len(aggregated)} program scopes -> {save_path}")
     return aggregated
 
+# ---------------------
+# Mode concurrent (API async)
+# ---------------------
+
+class HostRateLimiter:
+    """
+    Limiteur de débit par hôte : au plus `rate` requêtes/seconde vers un même hôte,
+    quelle que soit la concurrence. Les hôtes distincts ne se bloquent pas entre eux.
+    """
+
+    def __init__(self, rate: float = 4.0):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next: Dict[str, float] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    async def wait(self, url: str):
+        """Attend le prochain créneau libre pour l'hôte de `url`."""
+        if not self.interval:
+            return
+        host = urlparse(url).netloc
+        lock = self._locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            loop = asyncio.get_running_loop()
+            now = loop.time()
+            slot = max(now, self._next.get(host, now))
+            self._next[host] = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+async def _scrape_scope_async(page: AsyncPage, program_handle: str, limiter: HostRateLimiter,
+                              cache: Optional[RawScopeCache] = None) -> Dict[str, List[str]]:
+    """Équivalent async de _scrape_scope (même heuristique, même format de sortie)."""
+    url = f"{BASE}/{program_handle}"
+    await limiter.wait(url)
+    try:
+        await page.goto(url, wait_until="domcontentloaded")
+    except PWTimeout:
+        print(f"[!] Timeout loading {url}")
+        return {}
+
+    # ouvrir l'onglet "Scope" si présent
+    try:
+        await page.wait_for_selector("text=Scope", timeout=5000)
+        try:
+            await page.click("text=Scope", timeout=3000)
+            await page.wait_for_timeout(1000)
+        except Exception:
+            pass
+    except Exception:
+        pass
+
+    content = ""
+    block = None
+    for sel in SCOPE_SELECTORS:
+        try:
+            sec = page.locator(sel)
+            if await sec.count() > 0:
+                block = sec.first
+                content = await block.inner_text()
+                break
+        except Exception:
+            pass
+    if not content:
+        block = page.locator("body")
+        content = await page.inner_text("body")
+
+    if cache is not None:
+        try:
+            html = await block.inner_html()
+        except Exception:
+            html = ""
+        cache.put(program_handle, "dom", text=content, html=html)
+
+    return _parse_scope_text(content)
+
+async def _capture_scope_async(page: AsyncPage, program_handle: str, limiter: HostRateLimiter,
+                               timeout: int = 20, cache: Optional[RawScopeCache] = None
+                               ) -> Dict[str, List[str]]:
+    """Équivalent async de _capture_scope (mode "network")."""
+    url = f"{BASE}/{program_handle}/policy_scopes"
+    captured = []
+
+    def on_response(resp):
+        if SCOPE_RESPONSE_RE.search(resp.url):
+            captured.append(resp)
+
+    page.on("response", on_response)
+    try:
+        await limiter.wait(url)
+        try:
+            await page.goto(url, wait_until="commit")
+        except PWTimeout:
+            print(f"[!] Timeout loading {url}")
+            return {}
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        seen = 0
+        while True:
+            while seen < len(captured):
+                resp = captured[seen]
+                seen += 1
+                try:
+                    payload = await resp.json()
+                except Exception:
+                    continue
+                if not _is_program_response(payload, resp.request, program_handle):
+                    continue
+                scope = _scope_from_payload(payload)
+                if scope is not None:
+                    if cache is not None:
+                        cache.put(program_handle, "network", payload=payload)
+                    return scope
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return {}
+            try:
+                await page.wait_for_event("response", timeout=remaining * 1000)
+            except PWTimeout:
+                return {}
+    finally:
+        page.remove_listener("response", on_response)
+
+async def scrape_scopes_async(handles: List[str], concurrency: int = 8, rate: float = 4.0,
+                              timeout: int = 20, headless: bool = True,
+                              allowed_resources: Optional[Iterable[str]] = ALLOWED_RESOURCE_TYPES,
+                              mode: str = "dom",
+                              on_result: Optional[Callable[[str, Dict[str, List[str]]], None]] = None,
+                              cache: Optional[RawScopeCache] = None
+                              ) -> Dict[str, Dict[str, List[str]]]:
+    """
+    Récupère les scopes de `handles` avec `concurrency` pages ouvertes en parallèle
+    dans un seul navigateur. Retourne un dict {handle: scope} dans l'ordre de `handles`.
+    Les ressources hors de `allowed_resources` sont bloquées (None = tout charger).
+    `mode` : "dom" ou "network" (voir get_scope).
+    `on_result(handle, scope)` est appelé dès qu'un scope est récupéré (checkpoint).
+    `cache` : cache des captures brutes (voir RawScopeCache).
+    """
+    if mode not in EXTRACT_MODES:
+        raise ValueError(f"mode inconnu : {mode!r} (attendu : {', '.join(EXTRACT_MODES)})")
+    limiter = HostRateLimiter(rate)
+    results: Dict[str, Dict[str, List[str]]] = {}
+    todo: "asyncio.Queue[str]" = asyncio.Queue()
+    for h in handles:
+        todo.put_nowait(h)
+    total = len(handles)
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=headless)
+        ctx = await browser.new_context()
+        ctx.set_default_timeout(timeout * 1000)
+        if allowed_resources is not None:
+            allowed = frozenset(allowed_resources)
+
+            async def filter_route(route):
+                req = route.request
+                if _is_blocked_request(req.resource_type, req.url, allowed):
+                    await route.abort()
+                else:
+                    await route.continue_()
+
+            await ctx.route("**/*", filter_route)
+
+        async def worker():
+            # chaque worker garde sa page pour toute la durée du run
+            page = await ctx.new_page()
+            while True:
+                try:
+                    h = todo.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                try:
+                    if mode == "network":
+                        scope = await _capture_scope_async(page, h, limiter, timeout, cache)
+                    else:
+                        scope = await _scrape_scope_async(page, h, limiter, cache)
+                except Exception as e:
+                    print(f"[!] {h}: {e}")
+                    scope = {}
+                    if page.is_closed():
+                        page = await ctx.new_page()
+                results[h] = scope
+                if on_result is not None:
+                    on_result(h, scope)
+                print(f"[{len(results)}/{total}] {h} ... {_scope_summary(scope)}", flush=True)
+            await page.close()
+
+        await asyncio.gather(*(worker() for _ in range(max(1, min(concurrency, total)))))
+        await ctx.close()
+        await browser.close()
+
+    # conserver l'ordre des handles (même forme que le mode séquentiel)
+    return {h: results.get(h, {}) for h in handles}
+
 # Exécution directe si on lance le script
 if __name__ == "__main__":
-    scrape_hackerone()
+    parser = argparse.ArgumentParser(description="Scrape les scopes des programmes HackerOne.")
+    parser.add_argument("-o", "--output", default=OUTPUT, help="fichier JSON de sortie")
+    parser.add_argument("-c", "--concurrency", type=int, default=1,
+                        help="nombre de pages en parallèle (1 = mode séquentiel)")
+    parser.add_argument("--rate", type=float, default=4.0,
+                        help="requêtes/seconde max par hôte en mode concurrent")
+    parser.add_argument("--resources", default=",".join(sorted(ALLOWED_RESOURCE_TYPES)),
+                        help="types de ressources autorisés, séparés par des virgules ('all' = aucun blocage)")
+    parser.add_argument("--mode", choices=EXTRACT_MODES, default="dom",
+                        help="extraction du scope : texte rendu (dom) ou réponses JSON (network)")
+    parser.add_argument("--resume", action="store_true",
+                        help="reprendre un run interrompu (saute les handles du journal)")
+    parser.add_argument("--journal", default=None,
+                        help="journal de checkpoint JSONL (défaut : <output>.checkpoint.jsonl)")
+    parser.add_argument("--previous", default=None,
+                        help="programs.json précédent : ne re-scrape que les programmes nouveaux/modifiés")
+    parser.add_argument("--max-age", type=float, default=None,
+                        help="(incrémental) réutilise un scope sans marqueur s'il a moins de N jours")
+    parser.add_argument("--cache-dir", default=RAW_CACHE_DIR,
+                        help="cache des captures brutes ('' pour désactiver)")
+    parser.add_argument("--no-ndjson", action="store_true",
+                        help="ne pas émettre le flux programs.ndjson (un programme par ligne)")
+    parser.add_argument("--reparse", action="store_true",
+                        help="hors ligne : régénère le JSON depuis le cache, sans navigateur")
+    args = parser.parse_args()
+    if args.reparse:
+        reparse_cache(args.cache_dir or RAW_CACHE_DIR, args.output)
+    else:
+        allowed = None if args.resources == "all" else {r.strip() for r in args.resources.split(",") if r.strip()}
+        scrape_hackerone(args.output, concurrency=args.concurrency, rate=args.rate,
+                         allowed_resources=allowed, mode=args.mode,
+                         resume=args.resume, journal_path=args.journal,
+                         previous=args.previous, max_age_days=args.max_age,
+                         cache_dir=args.cache_dir or None, ndjson=not args.no_ndjson)
@@ -0,0 +1,264 @@
+"""
+Client DNS asyncio (UDP) minimal, sans dépendance externe.
+
+Un socket UDP par serveur de noms, les requêtes sont multiplexées par identifiant :
+des milliers de résolutions peuvent être en vol en même temps, avec un timeout et
+des essais par requête, en alternant entre les serveurs de noms configurés.
+
+Usage :
+    async with AsyncResolver(["1.1.1.1", "127.0.0.1:5353"]) as resolver:
+        record = await resolver.resolve("www.example.com")
+        # {"domain": ..., "a": [...], "aaaa": [...], "cname": [...], "ttl": 300,
+        #  "rcode": "NOERROR", "latency": 12.3}
+"""
+
+import asyncio
+import random
+import socket
+import struct
+import time
+
+# Types d'enregistrements
+TYPE_A = 1
+TYPE_CNAME = 5
+TYPE_AAAA = 28
+CLASS_IN = 1
+
+# Codes de réponse
+RCODES = {0: "NOERROR", 1: "FORMERR", 2: "SERVFAIL", 3: "NXDOMAIN", 4: "NOTIMP", 5: "REFUSED"}
+
+RESOLV_CONF = "/etc/resolv.conf"
+# Tampon de réception des sockets UDP : des milliers de réponses peuvent arriver d'un coup
+RECV_BUFFER = 4 * 1024 * 1024
+
+
+def parse_nameserver(spec, default_port=53):
+    """ "1.1.1.1" / "127.0.0.1:5353" / "[::1]:53" / "::1" -> (hôte, port) """
+    if isinstance(spec, tuple):
+        return spec
+    if spec.startswith("["):
+        host, _, port = spec[1:].partition("]")
+        return host, int(port.lstrip(":") or default_port)
+    if spec.count(":") == 1:
+        host, port = spec.split(":")
+        return host, int(port)
+    return spec, default_port
+
+
+def enlarge_recv_buffer(transport, size=RECV_BUFFER):
+    """Agrandit le tampon de réception du socket (plafonné par le noyau, best effort)."""
+    sock = transport.get_extra_info("socket")
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, size)
+    except (OSError, AttributeError):
+        pass
+
+
+def system_nameservers(path=RESOLV_CONF):
+    """Serveurs de noms du système (resolv.conf), 127.0.0.1 à défaut."""
+    servers = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0] == "nameserver":
+                    servers.append(parts[1].split("%")[0])
+    except OSError:
+        pass
+    return servers or ["127.0.0.1"]
+
+
+# === Encodage / décodage des messages DNS === #
+
+def build_query(qid, name, qtype):
+    """Message de requête (récursion demandée) pour `name` (A-labels)."""
+    qname = b""
+    for label in name.rstrip(".").split("."):
+        raw = label.encode("ascii")
+        if not raw or len(raw) > 63:
+            raise ValueError(f"label invalide dans {name!r}")
+        qname += bytes([len(raw)]) + raw
+    header = struct.pack("!HHHHHH", qid, 0x0100, 1, 0, 0, 0)
+    return header + qname + b"\x00" + struct.pack("!HH", qtype, CLASS_IN)
+
+
+def _read_name(data, offset):
+    """Lit un nom (avec pointeurs de compression) ; retourne (nom, offset suivant)."""
+    labels = []
+    end = None
+    for _ in range(128):
+        length = data[offset]
+        if length & 0xC0 == 0xC0:
+            if end is None:
+                end = offset + 2
+            offset = ((length & 0x3F) << 8) | data[offset + 1]
+            continue
+        offset += 1
+        if length == 0:
+            return ".".join(labels).lower(), end if end is not None else offset
+        labels.append(data[offset:offset + length].decode("ascii", "replace"))
+        offset += length
+    raise ValueError("boucle de compression")
+
+
+def parse_response(data):
+    """
+    Décode une réponse : (qid, rcode, nom demandé, [(nom, type, ttl, valeur), ...]).
+    Valeur : adresse pour A/AAAA, nom cible pour CNAME (autres types ignorés).
+    """
+    qid, flags, qdcount, ancount, _, _ = struct.unpack("!HHHHHH", data[:12])
+    offset = 12
+    qname = ""
+    for _ in range(qdcount):
+        qname, offset = _read_name(data, offset)
+        offset += 4
+    answers = []
+    for _ in range(ancount):
+        name, offset = _read_name(data, offset)
+        rtype, _, ttl, rdlength = struct.unpack("!HHIH", data[offset:offset + 10])
+        offset += 10
+        rdata = data[offset:offset + rdlength]
+        if rtype == TYPE_A and rdlength == 4:
+            answers.append((name, rtype, ttl, socket.inet_ntop(socket.AF_INET, rdata)))
+        elif rtype == TYPE_AAAA and rdlength == 16:
+            answers.append((name, rtype, ttl, socket.inet_ntop(socket.AF_INET6, rdata)))
+        elif rtype == TYPE_CNAME:
+            answers.append((name, rtype, ttl, _read_name(data, offset)[0]))
+        offset += rdlength
+    return qid, RCODES.get(flags & 0x0F, str(flags & 0x0F)), qname, answers
+
+
+# === Transport === #
+
+class _DNSProtocol(asyncio.DatagramProtocol):
+    """Socket UDP d'un serveur de noms : associe chaque réponse à sa requête par identifiant."""
+
+    def __init__(self):
+        self.transport = None
+        self.pending = {}
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        if len(data) < 12:
+            return
+        future = self.pending.pop(int.from_bytes(data[:2], "big"), None)
+        if future is not None and not future.done():
+            future.set_result(data)
+
+    def error_received(self, exc):
+        # ICMP port unreachable... : la requête finira en timeout puis sera réessayée
+        pass
+
+    def new_id(self):
+        while True:
+            qid = random.getrandbits(16)
+            if qid not in self.pending:
+                return qid
+
+
+class AsyncResolver:
+    """
+    Résolveur asyncio.
+    - nameservers : liste "hôte[:port]" (par défaut ceux de resolv.conf)
+    - timeout : secondes par essai
+    - retries : essais supplémentaires (serveur de noms suivant à chaque essai)
+    - concurrency : requêtes en vol au maximum
+    """
+
+    def __init__(self, nameservers=None, timeout=2.0, retries=2, concurrency=1000):
+        self.nameservers = [parse_nameserver(ns) for ns in (nameservers or system_nameservers())]
+        self.timeout = timeout
+        self.retries = retries
+        self.concurrency = min(concurrency, 60000)
+        self._protocols = []
+        self._semaphore = None
+
+    async def open(self):
+        loop = asyncio.get_running_loop()
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        for host, port in self.nameservers:
+            transport, protocol = await loop.create_datagram_endpoint(_DNSProtocol, remote_addr=(host, port))
+            enlarge_recv_buffer(transport)
+            self._protocols.append(protocol)
+        return self
+
+    def close(self):
+        for protocol in self._protocols:
+            if protocol.transport:
+                protocol.transport.close()
+        self._protocols = []
+
+    async def __aenter__(self):
+        return await self.open()
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+    async def query(self, name, qtype):
+        """
+        Une requête (`qtype` = TYPE_A, TYPE_AAAA, TYPE_CNAME) avec timeout et essais.
+        Retourne (rcode, réponses) ; rcode "TIMEOUT" si aucun serveur n'a répondu.
+        """
+        start = random.randrange(len(self._protocols))
+        async with self._semaphore:
+            for attempt in range(self.retries + 1):
+                protocol = self._protocols[(start + attempt) % len(self._protocols)]
+                qid = protocol.new_id()
+                future = asyncio.get_running_loop().create_future()
+                protocol.pending[qid] = future
+                protocol.transport.sendto(build_query(qid, name, qtype))
+                try:
+                    data = await asyncio.wait_for(future, self.timeout)
+                except asyncio.TimeoutError:
+                    protocol.pending.pop(qid, None)
+                    continue
+                try:
+                    _, rcode, qname, answers = parse_response(data)
+                except (ValueError, IndexError, struct.error):
+                    continue
+                # Réponse à une autre question (identifiant réutilisé) : on réessaie
+                if qname != name.rstrip(".").lower():
+                    continue
+                return rcode, answers
+        return "TIMEOUT", []
+
+    async def resolve(self, domain):
+        """
+        Résout A et AAAA en parallèle.
+        Retourne {"domain", "a", "aaaa", "cname" (chaîne dans l'ordre), "ttl" (minimum),
+        "rcode", "latency" (ms)}.
+        """
+        record = {"domain": domain, "a": [], "aaaa": [], "cname": [], "ttl": None,
+                  "rcode": "NOERROR", "latency": 0.0}
+        t0 = time.perf_counter()
+        try:
+            results = await asyncio.gather(self.query(domain, TYPE_A), self.query(domain, TYPE_AAAA))
+        except ValueError:
+            record["rcode"] = "FORMERR"
+            return record
+        record["latency"] = round((time.perf_counter() - t0) * 1000, 2)
+
+        ttls = []
+        cnames = {}
+        for rcode, answers in results:
+            if rcode != "NOERROR":
+                record["rcode"] = rcode
+            for name, rtype, ttl, value in answers:
+                ttls.append(ttl)
+                if rtype == TYPE_A and value not in record["a"]:
+                    record["a"].append(value)
+                elif rtype == TYPE_AAAA and value not in record["aaaa"]:
+                    record["aaaa"].append(value)
+                elif rtype == TYPE_CNAME:
+                    cnames[name] = value
+        # Chaîne CNAME dans l'ordre : domain -> c1 -> c2 ...
+        name = domain.lower()
+        while name in cnames and len(record["cname"]) < 16:
+            name = cnames[name]
+            record["cname"].append(name)
+        if record["a"] or record["aaaa"]:
+            record["rcode"] = "NOERROR"
+        record["ttl"] = min(ttls) if ttls else None
+        return record
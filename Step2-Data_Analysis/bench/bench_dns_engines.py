@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+bench_dns_engines.py
+
+Benchmark du moteur DNS asyncio de check_domains() contre un serveur DNS local
+(dns_stub.py) : hôtes réels (dont chaînes CNAME et AAAA seuls), une zone avec
+wildcard DNS et des noms inexistants. Le serveur simule une latence et des pertes
+pour exercer les timeouts et les essais.
+
+Vérifie que les domaines actifs sont exactement les hôtes réels (candidats du
+wildcard écartés), puis compare le débit selon le nombre de requêtes en vol.
+
+Usage :
+    python3 bench/bench_dns_engines.py [-n 3000] [--delay 0.02] [--drop 0.02]
+"""
+
+import sys
+import time
+import asyncio
+import argparse
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent))
+
+import clean_hackerone_domains_v2 as cleaner  # noqa: E402
+from async_dns import AsyncResolver  # noqa: E402
+from dns_stub import StubDNSServer  # noqa: E402
+
+
+def build_zone(n):
+    """Enregistrements du serveur de test et noms à vérifier (un tiers de chaque sorte)."""
+    records = {"edge.cdn.example.net": {"A": ["10.8.0.1", "10.8.0.2"]}}
+    expected = set()
+    names = []
+    for i in range(n // 3):
+        host = f"host{i}.example.com"
+        if i % 10 == 0:
+            records[host] = {"CNAME": f"alias{i}.example.com"}
+            records[f"alias{i}.example.com"] = {"CNAME": "edge.cdn.example.net"}
+        elif i % 10 == 1:
+            records[host] = {"AAAA": [f"2001:db8::{i % 65535:x}"]}
+        else:
+            records[host] = {"A": [f"10.1.{i // 250 % 250}.{i % 250 + 1}"]}
+        expected.add(host)
+        names += [host, f"guess{i}.wild.example.com", f"missing{i}.example.com"]
+    return records, {"wild.example.com": ["10.9.9.9"]}, names, expected
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("-n", "--names", type=int, default=3000, help="nombre de noms à vérifier")
+    parser.add_argument("--delay", type=float, default=0.02, help="latence simulée du serveur (s)")
+    parser.add_argument("--drop", type=float, default=0.02, help="taux de perte simulé")
+    args = parser.parse_args()
+
+    records, wildcards, names, expected = build_zone(args.names)
+    server = StubDNSServer(records, wildcards, delay=args.delay, drop=args.drop).start()
+    print(f"{len(names)} names, stub DNS on {server.address} "
+          f"(delay {args.delay * 1000:.0f} ms, drop {args.drop:.0%})")
+
+    # Enregistrement complet d'un hôte derrière une chaîne CNAME
+    async def one():
+        async with AsyncResolver([server.address], timeout=0.5) as resolver:
+            return await resolver.resolve("host0.example.com")
+    print(f"  sample record: {asyncio.run(one())}")
+
+    print(f"  {'in flight':>10} {'wall time':>10} {'names/s':>10} {'active':>7}")
+    for concurrency in (20, 200, 1000):
+        server.queries = 0
+        detector = cleaner.WildcardDetector()
+        t0 = time.perf_counter()
+        active = cleaner.check_domains(
+            names, detector=detector, engine="async", nameservers=[server.address],
+            timeout=0.5, retries=3, concurrency=concurrency,
+        )
+        elapsed = time.perf_counter() - t0
+        assert set(active) == expected, (len(active), len(expected))
+        print(f"  {concurrency:>10} {elapsed:>9.2f}s {len(names) / elapsed:>10.0f} {len(active):>7}"
+              f"   ({server.queries} queries, {detector.filtered} wildcard hits filtered)")
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
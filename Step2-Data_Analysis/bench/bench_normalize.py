@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+bench_normalize.py
+
+Benchmark de la normalisation des domaines sur le programs.json fourni :
+ancien chemin (copie figée de la boucle d'origine : pattern recompilé à chaque appel,
+normalize_domain d'origine appelé sur chaque match) contre normalize_domains() (une
+passe, patterns précompilés, cache des entrées répétées). Le nouveau chemin valide
+aussi les TLD (PSL) et les noms Unicode (IDNA) : les deux listes ne sont pas
+identiques, leurs différences sont affichées.
+
+Usage :
+    python3 bench/bench_normalize.py [-r 5] [-f programs.json]
+"""
+
+import re
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+from urllib.parse import urlparse
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent))
+
+import clean_hackerone_domains_v2 as cleaner  # noqa: E402
+
+
+def legacy_normalize_domain(text):
+    """Version d'origine de normalize_domain (référence figée, ne pas modifier)."""
+    if not text:
+        return None
+    text = text.strip().lower()
+    if text.startswith("http"):
+        parsed = urlparse(text)
+        text = parsed.netloc or parsed.path
+    text = text.strip("*/ \t\n\r")
+    text = text.replace("\\", "").replace(":", "").replace("–", "-")
+    text = re.sub(r"[^a-z0-9\.\-]", "", text)
+    if any(skip in text for skip in ["node.js", "com.", "android", "ios"]):
+        return None
+    if re.fullmatch(r"(?:[a-zA-Z0-9-]+\.)+[a-zA-Z]{2,}", text):
+        return text
+    return None
+
+
+def legacy_path(entries):
+    """Boucle d'origine d'extract_domains (sans l'expansion des wildcards)."""
+    domain_pattern = re.compile(r"(?:(?:\*\.)?(?:[a-zA-Z0-9-]+\.)+[a-zA-Z]{2,})")
+    domains = set()
+    for entry in entries:
+        for match in domain_pattern.findall(str(entry)):
+            norm = legacy_normalize_domain(match)
+            if norm:
+                domains.add(norm)
+    return domains
+
+
+def batch_path(entries):
+    """Nouveau chemin : normalize_domains() en une passe (cache vidé à chaque run)."""
+    cleaner._normalize_entry.cache_clear()
+    cleaner.to_ascii.cache_clear()
+    return set(cleaner.normalize_domains(entries))
+
+
+def bench(label, func, entries, rounds):
+    """Meilleur temps sur `rounds` passes."""
+    best = float("inf")
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        result = func(entries)
+        best = min(best, time.perf_counter() - t0)
+    print(f"  {label:<20} {best * 1000:>9.2f} ms  ({len(result)} domains)")
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("-r", "--rounds", type=int, default=5, help="nombre de passes (meilleur temps retenu)")
+    parser.add_argument("-f", "--file", default=str(HERE.parent / "programs.json"), help="fichier de scopes")
+    args = parser.parse_args()
+
+    with open(args.file, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    entries = [v for sections in data.values() for values in sections.values()
+               if isinstance(values, list) for v in values]
+    print(f"{len(entries)} raw entries ({len(set(entries))} distinct) from {args.file}")
+
+    old, old_result = bench("legacy per-match", legacy_path, entries, args.rounds)
+    new, new_result = bench("normalize_domains", batch_path, entries, args.rounds)
+    print(f"  -> x{old / new:.1f}")
+    # Différences attendues : TLD inconnus, identifiants d'applications, noms Unicode...
+    new_hosts = {d[2:] if d.startswith("*.") else d for d in new_result}
+    print(f"  only legacy: {len(old_result - new_hosts)}  only new: {len(new_hosts - old_result)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+dns_stub.py
+
+Serveur DNS UDP local minimal pour les benchmarks de l'étape 2 (aucun accès réseau).
+
+Répond à partir d'un dictionnaire d'enregistrements :
+    records   = {"www.example.com": {"A": ["10.0.0.1"], "AAAA": [...], "CNAME": "edge.cdn.net"}}
+    wildcards = {"wild.example.com": ["10.9.9.9"]}   # *.wild.example.com IN A 10.9.9.9
+Les autres noms donnent NXDOMAIN. Une latence et un taux de perte simulés permettent
+d'exercer les timeouts et les essais du client.
+
+Usage :
+    server = StubDNSServer(records, wildcards, delay=0.02, drop=0.05).start()
+    ... nameservers=[server.address] ...
+    server.stop()
+"""
+
+import sys
+import random
+import struct
+import asyncio
+import ipaddress
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from async_dns import TYPE_A, TYPE_AAAA, TYPE_CNAME, CLASS_IN, _read_name, enlarge_recv_buffer  # noqa: E402
+
+
+def _encode_name(name):
+    return b"".join(bytes([len(label)]) + label.encode("ascii") for label in name.split(".")) + b"\x00"
+
+
+def _rr(name, rtype, ttl, rdata):
+    return _encode_name(name) + struct.pack("!HHIH", rtype, CLASS_IN, ttl, len(rdata)) + rdata
+
+
+class _StubProtocol(asyncio.DatagramProtocol):
+
+    def __init__(self, server):
+        self.server = server
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        server = self.server
+        server.queries += 1
+        if server.drop and random.random() < server.drop:
+            return
+        response = server.answer(data)
+        if server.delay:
+            asyncio.get_running_loop().call_later(server.delay, self.transport.sendto, response, addr)
+        else:
+            self.transport.sendto(response, addr)
+
+
+class StubDNSServer:
+    """Serveur DNS de test dans un thread (boucle asyncio dédiée)."""
+
+    def __init__(self, records=None, wildcards=None, delay=0.0, drop=0.0, ttl=300, host="127.0.0.1"):
+        self.records = records or {}
+        self.wildcards = wildcards or {}
+        self.delay = delay
+        self.drop = drop
+        self.ttl = ttl
+        self.host = host
+        self.port = None
+        self.queries = 0
+        self._loop = None
+        self._thread = None
+
+    @property
+    def address(self):
+        """ "hôte:port" à passer comme serveur de noms. """
+        return f"{self.host}:{self.port}"
+
+    def _lookup(self, name):
+        if name in self.records:
+            return self.records[name]
+        for zone, ips in self.wildcards.items():
+            if name.endswith("." + zone):
+                return {"A": ips}
+        return None
+
+    def answer(self, query):
+        """Réponse à un message de requête (chaîne CNAME suivie, NXDOMAIN sinon)."""
+        qid = struct.unpack("!H", query[:2])[0]
+        qname, offset = _read_name(query, 12)
+        qtype = struct.unpack("!H", query[offset:offset + 2])[0]
+        question = query[12:offset + 4]
+
+        answers = []
+        name = qname
+        record = self._lookup(name)
+        rcode = 0 if record is not None else 3
+        while record is not None and len(answers) < 16:
+            if "CNAME" in record:
+                answers.append(_rr(name, TYPE_CNAME, self.ttl, _encode_name(record["CNAME"])))
+                name = record["CNAME"]
+                record = self._lookup(name)
+                continue
+            for ip in record.get("A", []) if qtype == TYPE_A else []:
+                answers.append(_rr(name, TYPE_A, self.ttl, bytes(map(int, ip.split(".")))))
+            for ip in record.get("AAAA", []) if qtype == TYPE_AAAA else []:
+                answers.append(_rr(name, TYPE_AAAA, self.ttl, ipaddress.IPv6Address(ip).packed))
+            break
+        header = struct.pack("!HHHHHH", qid, 0x8180 | rcode, 1, len(answers), 0, 0)
+        return header + question + b"".join(answers)
+
+    def start(self):
+        ready = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            transport, _ = self._loop.run_until_complete(self._loop.create_datagram_endpoint(
+                lambda: _StubProtocol(self), local_addr=(self.host, 0)
+            ))
+            enlarge_recv_buffer(transport)
+            self.port = transport.get_extra_info("sockname")[1]
+            ready.set()
+            self._loop.run_forever()
+            transport.close()
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self
+
+    def stop(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
@@ -1,8 +1,11 @@
-import json
+import argparse
 import re
 import socket
 
-def extract_domains(programs_filename):
+from program_stream import iter_programs
+
+
+def extract_domains(programs_filename, follow=False):
     """
     Lit le fichier JSON et extrait tous les domaines syntaxiquement valides.
     Retourne une liste sans doublons.
@@ -12,10 +15,8 @@ def extract_domains(programs_filename):
         r"(?:(?:\*\.)?(?:[a-zA-Z0-9-]+\.)+[a-zA-Z]{2,})"
     )
 
-    with open(programs_filename, "r", encoding="utf-8") as f:
-        data = json.load(f)
-
-    for program, sections in data.items():
+    # Lecture en flux : programs.json ou programs.ndjson (un programme par ligne)
+    for program, sections in iter_programs(programs_filename, follow=follow):
         for key, values in sections.items():
             if isinstance(values, list):
                 for v in values:
@@ -51,12 +52,12 @@ def check_domains(domains_list):
     return active_domains
 
 
-def clean_domains(programs_filename="programs.json"):
+def clean_domains(programs_filename="programs.json", follow=False):
     """
     Combine extraction + vérification et sauvegarde les domaines actifs dans domains.txt.
     """
     print("📤 Extraction des domaines valides...")
-    all_domains = extract_domains(programs_filename)
+    all_domains = extract_domains(programs_filename, follow=follow)
     print(f"→ {len(all_domains)} domaines valides trouvés.")
 
     print("🌐 Vérification des domaines actifs (résolution DNS)...")
@@ -70,4 +71,10 @@ def clean_domains(programs_filename="programs.json"):
 
 
 if __name__ == "__main__":
-    clean_domains("programs.json")
+    parser = argparse.ArgumentParser(description="Nettoyage et vérification des domaines HackerOne")
+    parser.add_argument("programs", nargs="?", default="programs.json",
+                        help="programs.json ou programs.ndjson")
+    parser.add_argument("--follow", action="store_true",
+                        help="suit programs.ndjson pendant que le scraper l'écrit encore")
+    args = parser.parse_args()
+    clean_domains(args.programs, follow=args.follow)
@@ -1,17 +1,107 @@
+import argparse
+import asyncio
+import csv
 import json
 import re
+import secrets
 import socket
+import threading
+import time
 import concurrent.futures
+from functools import lru_cache
+from itertools import chain
 from urllib.parse import urlparse
 
+from async_dns import AsyncResolver
+from dns_cache import DNS_CACHE_FILE, DNSCache
+from program_stream import iter_programs
+from public_suffix import get_psl
+
+# === Patterns précompilés === #
+
+# Label (ASCII ou Unicode : lettres/chiffres de toutes écritures, ZWNJ/ZWJ inclus pour être
+# rejetés par to_ascii plutôt que de couper le nom) et TLD (lettres ou punycode)
+_LABEL = r"[\w\u200c\u200d-]+"
+_TLD = r"[^\W\d_]{2,}(?:(?<=[xX][nN])--[a-zA-Z0-9-]+)?"
+# Domaine (avec wildcard éventuel) dans une entrée brute de scope
+DOMAIN_PATTERN = re.compile(rf"(?:(?:\*\.)?(?:{_LABEL}\.)+{_TLD})")
+# Même pattern, avec le préfixe wildcard capturé à part (normalisation en lot)
+DOMAIN_PARTS_RE = re.compile(rf"(\*\.)?((?:{_LABEL}\.)+{_TLD})")
+# Caractères non valides dans un nom de domaine (avant conversion IDNA)
+INVALID_CHARS_RE = re.compile(r"[^\w.\-]|_")
+# Domaine syntaxiquement valide (A-labels uniquement)
+VALID_DOMAIN_RE = re.compile(r"(?:[a-z0-9-]+\.)+(?:[a-z]{2,}|xn--[a-z0-9-]+)")
+# Identifiants d'applications en notation inversée (com.twitter.android, org.mozilla.ios...) :
+# TLD générique en tête et pas à la fin ("net.s2stagehance.com" reste un hôte). La PSL ne
+# suffit pas : android, app, tv... sont de vrais TLD
+PACKAGE_NAME_RE = re.compile(r"^(?:com|org|net|io)\.(?!.*\.(?:com|org|net|io)$)")
+
+# Points "idéographiques" acceptés comme séparateurs de labels (RFC 3490)
+UNICODE_DOTS = str.maketrans({"\u3002": ".", "\uff0e": ".", "\uff61": "."})
+# A-label syntaxiquement valide (décodé ensuite par punycode pour vérification)
+A_LABEL_RE = re.compile(r"xn--[a-z0-9-]{1,59}")
+# Caractères que le codec idna (IDNA 2003) remplace au lieu de les encoder : ß -> ss,
+# ς -> σ, ZWNJ/ZWJ supprimés. Sous IDNA 2008 ce sont des noms différents.
+IDNA2003_REMAPPED_RE = re.compile("[\u00df\u03c2\u200c\u200d]")
+
 # === Helper Functions === #
 
+def _decode_label(label):
+    """U-label d'un A-label ("xn--bcher-kva" -> "bücher"), None si le punycode est invalide."""
+    if not A_LABEL_RE.fullmatch(label):
+        return None
+    try:
+        return label[4:].encode("ascii").decode("punycode")
+    except UnicodeError:
+        return None
+
+
+@lru_cache(maxsize=65536)
+def to_ascii(host):
+    """
+    Forme canonique ASCII (A-labels) d'un nom d'hôte : "bücher.de" -> "xn--bcher-kva.de".
+    Les A-labels déjà présents sont gardés tels quels (en minuscules) s'ils sont du
+    punycode valide : le codec idna (IDNA 2003) les altérerait ("xn--strae-oqa" = straße).
+    Les noms Unicode contenant ß, ς, ZWNJ ou ZWJ sont rejetés plutôt que remplacés
+    ("straße.de" n'est pas "strasse.de"). Retourne None si le nom n'est pas encodable.
+    """
+    host = host.translate(UNICODE_DOTS).lower()
+    if host.isascii():
+        if "xn--" in host and any(
+            label.startswith("xn--") and _decode_label(label) is None for label in host.split(".")
+        ):
+            return None
+        return host
+    if IDNA2003_REMAPPED_RE.search(host):
+        return None
+    try:
+        return host.encode("idna").decode("ascii")
+    except UnicodeError:
+        return None
+
+
+@lru_cache(maxsize=65536)
+def to_unicode(host):
+    """Forme Unicode (U-labels) d'un nom d'hôte ASCII, pour l'affichage. None si invalide."""
+    labels = []
+    for label in host.lower().split("."):
+        if label.startswith("xn--"):
+            label = _decode_label(label)
+            if label is None:
+                return None
+        labels.append(label)
+    return ".".join(labels)
+
+
 def normalize_domain(text):
     """
     Corrige automatiquement les erreurs de syntaxe courantes :
     - Supprime http(s)://, chemins, ports, etc.
     - Corrige les espaces, tabs et punycode.
     - Enlève les caractères non valides.
+    - Convertit les noms Unicode en A-labels (IDNA) : "bücher.de" -> "xn--bcher-kva.de".
+    - Rejette les TLD inconnus de la Public Suffix List (et les suffixes publics seuls).
+    - Conserve le préfixe des wildcards : "*.Example.com/" -> "*.example.com".
     """
     if not text:
         return None
@@ -22,109 +112,750 @@ def normalize_domain(text):
         parsed = urlparse(text)
         text = parsed.netloc or parsed.path
 
-    # Enlève wildcards et caractères parasites
+    # Enlève wildcards et caractères parasites (le préfixe "*." est conservé à part)
+    text = text.strip("/ \t\n\r")
+    wildcard = text.startswith("*.")
+    if wildcard:
+        text = text[2:]
     text = text.strip("*/ \t\n\r")
     text = text.replace("\\", "").replace(":", "").replace("–", "-")
 
+    # ZWNJ/ZWJ : rejetés comme dans to_ascii (les supprimer changerait le nom)
+    if IDNA2003_REMAPPED_RE.search(text):
+        return None
+
     # Supprime les éventuels caractères non alphabétiques à la fin
-    text = re.sub(r"[^a-z0-9\.\-]", "", text)
+    text = INVALID_CHARS_RE.sub("", text.translate(UNICODE_DOTS))
+
+    # Forme canonique ASCII (IDNA)
+    text = to_ascii(text) if text else None
+    if not text:
+        return None
 
-    # Retire les sous-chaînes suspectes (android/com/node.js)
-    if any(skip in text for skip in ["node.js", "com.", "android", "ios"]):
+    # Retire les identifiants d'applications (com.xxx.android, org.xxx.ios...)
+    if PACKAGE_NAME_RE.match(text):
         return None
 
-    # Valide que c’est un vrai domaine
-    if re.fullmatch(r"(?:[a-zA-Z0-9-]+\.)+[a-zA-Z]{2,}", text):
-        return text
+    # Valide que c’est un vrai domaine, avec un TLD existant (section ICANN de la PSL :
+    # github.io, myshopify.com... sont des suffixes privés mais des cibles valides)
+    if VALID_DOMAIN_RE.fullmatch(text) and get_psl(private=False).is_valid(text):
+        return f"*.{text}" if wildcard else text
     return None
 
 
-def expand_wildcard(domain):
+@lru_cache(maxsize=65536)
+def _normalize_entry(entry):
+    """
+    Normalise toutes les correspondances d'une entrée brute de scope.
+    Équivalent à normalize_domain() sur chaque match de DOMAIN_PATTERN : un match ne
+    contient que des lettres, chiffres, "." et "-" (et un éventuel "*." en tête), donc
+    urlparse, replace et le nettoyage des caractères sont inutiles. Résultat mis en cache : beaucoup de
+    programmes partagent les mêmes entrées (*.agilebits.com...).
+    """
+    psl = get_psl(private=False)
+    out = []
+    if not entry.isascii():
+        entry = entry.translate(UNICODE_DOTS)
+    for wildcard, domain in DOMAIN_PARTS_RE.findall(entry):
+        # "_" est retiré comme dans normalize_domain (INVALID_CHARS_RE)
+        domain = domain.replace("_", "")
+        # Passage par le codec IDNA seulement pour les noms Unicode ou punycode
+        # (minuscules d'abord : "XN--" doit aussi être validé)
+        domain = domain.lower()
+        if not domain.isascii() or "xn--" in domain:
+            domain = to_ascii(domain)
+        if not domain or PACKAGE_NAME_RE.match(domain) or not psl.is_valid(domain):
+            continue
+        out.append(f"*.{domain}" if wildcard else domain)
+    return tuple(out)
+
+
+def normalize_domains(entries):
+    """
+    Normalise en une passe une liste (ou un itérable) d'entrées brutes de scope.
+    Chaque entrée peut contenir plusieurs domaines ; les entrées répétées ne sont
+    traitées qu'une fois (cache).
+    Retourne la liste ordonnée et sans doublons des domaines normalisés.
+    """
+    out = {}
+    for entry in entries:
+        for norm in _normalize_entry(str(entry)):
+            out[norm] = None
+    return list(out)
+
+
+def group_by_registrable_domain(domains):
+    """
+    Regroupe des domaines par domaine enregistrable (PSL, sections ICANN et privée) :
+    {"audible.com": ["tax.audible.com", "www.audible.com"], ...}
+    Permet aux étapes suivantes de traiter le travail par zone.
+    """
+    psl = get_psl()
+    groups = {}
+    for d in domains:
+        groups.setdefault(psl.registrable_domain(d) or d, []).append(d)
+    return groups
+
+
+class ScopeTrie:
+    """
+    Trie de labels inversés ("api.example.com" -> com -> example -> api) des hôtes
+    et wildcards du scope. Un hôte explicite marque son nœud avec "$", un wildcard
+    "*.example.com" marque le nœud example.com avec "*".
+    Toutes les requêtes coûtent O(nombre de labels), sans parcourir de liste.
+    """
+
+    HOST = "$"
+    WILDCARD = "*"
+
+    def __init__(self, names=()):
+        self._root = {}
+        for name in names:
+            self.add(name)
+
+    @staticmethod
+    def _labels(host):
+        return reversed(host.lower().rstrip(".").split("."))
+
+    def add(self, name):
+        """Ajoute un hôte ("api.example.com") ou un wildcard ("*.example.com")."""
+        wildcard = name.startswith("*.")
+        node = self._root
+        for label in self._labels(name[2:] if wildcard else name):
+            node = node.setdefault(label, {})
+        node[self.WILDCARD if wildcard else self.HOST] = True
+
+    def _find(self, host):
+        node = self._root
+        for label in self._labels(host):
+            node = node.get(label)
+            if node is None:
+                return None
+        return node
+
+    def __contains__(self, host):
+        """Vrai si `host` (ou le wildcard "*.x") a été ajouté explicitement."""
+        wildcard = host.startswith("*.")
+        node = self._find(host[2:] if wildcard else host)
+        return node is not None and (self.WILDCARD if wildcard else self.HOST) in node
+
+    def covering_wildcard(self, host):
+        """
+        Wildcard le plus large qui couvre `host` ("*.example.com" pour
+        "a.b.example.com"), ou None. La racine elle-même n'est pas couverte
+        ("*.example.com" ne couvre pas "example.com").
+        """
+        node = self._root
+        labels = list(self._labels(host))
+        for depth, label in enumerate(labels):
+            if depth and self.WILDCARD in node:
+                return "*." + ".".join(reversed(labels[:depth]))
+            node = node.get(label)
+            if node is None:
+                return None
+        return None
+
+    def is_covered(self, host):
+        """Vrai si `host` tombe sous un wildcard du scope."""
+        return self.covering_wildcard(host) is not None
+
+    def _walk(self, node, labels):
+        for label, child in node.items():
+            if label in (self.HOST, self.WILDCARD):
+                continue
+            path = labels + [label]
+            name = ".".join(reversed(path))
+            if self.HOST in child:
+                yield name
+            if self.WILDCARD in child:
+                yield f"*.{name}"
+            yield from self._walk(child, path)
+
+    def __iter__(self):
+        """Itère sur les hôtes et wildcards (ordre du trie)."""
+        return self._walk(self._root, [])
+
+    def hosts(self):
+        """Hôtes explicites."""
+        return [n for n in self if not n.startswith("*.")]
+
+    def wildcards(self):
+        """Wildcards ("*.example.com")."""
+        return [n for n in self if n.startswith("*.")]
+
+    def uncovered_hosts(self):
+        """Hôtes explicites qui ne sont couverts par aucun wildcard."""
+        return [h for h in self.hosts() if not self.is_covered(h)]
+
+    def to_dict(self):
+        """Scope sous forme d'arbre compact (sérialisable en JSON)."""
+        return self._root
+
+
+# === Expansion des wildcards === #
+
+# Sous-domaines usuels (mots par défaut du moteur d'expansion)
+COMMON_SUBS = (
+    "www", "api", "app", "dev", "staging", "test", "portal", "login",
+    "dashboard", "beta", "mail", "cdn"
+)
+# Label DNS valide (A-label)
+LABEL_RE = re.compile(r"[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?")
+# Champs contenant des noms d'hôtes dans les exports de logs CT (crt.sh...)
+PASSIVE_KEYS = ("name_value", "common_name", "name", "host", "domain")
+
+
+def iter_wordlist(path):
+    """Lit une wordlist en flux (un mot par ligne, "#" = commentaire) : mémoire constante."""
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        for line in f:
+            word = line.strip().lower()
+            if word and not word.startswith("#"):
+                yield word
+
+
+def _passive_names(record):
+    """Noms d'hôtes d'un enregistrement passif (un champ peut en contenir plusieurs)."""
+    if isinstance(record, str):
+        yield from record.split()
+        return
+    for key in PASSIVE_KEYS:
+        if isinstance(record.get(key), str):
+            yield from record[key].split()
+
+
+def iter_passive_hosts(path):
+    """
+    Lit les noms d'hôtes d'une source passive locale (export de logs CT, dump DNS...) :
+    - .jsonl / .ndjson : un objet par ligne (clés PASSIVE_KEYS), lu en flux
+    - .json : export crt.sh (liste d'objets "name_value" / "common_name"), chargé en entier
+    - sinon : texte, un nom par ligne, lu en flux
+    """
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        if path.endswith(".json"):
+            records = json.load(f)
+        elif path.endswith((".jsonl", ".ndjson")):
+            records = (json.loads(line) for line in f if line.strip())
+        else:
+            records = f
+        for record in records:
+            for name in _passive_names(record):
+                yield name
+
+
+class WildcardExpander:
+    """
+    Moteur d'expansion des wildcards : génère paresseusement les candidats
+    "<préfixe>.<racine>" de chaque "*.racine" du scope, sans jamais charger les
+    wordlists en mémoire.
+
+    - words : mots en mémoire (par défaut COMMON_SUBS)
+    - wordlists : fichiers de mots, relus en flux pour chaque racine
+    - permutations : gabarits appliqués à chaque mot : "{word}", "dev-{word}",
+      "{word}-staging", "{word}{n}"...
+    - numbers : valeurs de {n} pour les gabarits numériques (range(1, 4) -> api1..api3)
+    - passive : sources passives locales (voir iter_passive_hosts)
+    """
+
+    def __init__(self, words=COMMON_SUBS, wordlists=(), permutations=("{word}",),
+                 numbers=(), passive=()):
+        self.words = tuple(words)
+        self.wordlists = tuple(wordlists)
+        self.permutations = tuple(permutations)
+        self.numbers = tuple(numbers)
+        self.passive = tuple(passive)
+
+    def _words(self):
+        yield from self.words
+        for path in self.wordlists:
+            yield from iter_wordlist(path)
+
+    def _prefixes(self, word):
+        for template in self.permutations:
+            if "{n}" in template:
+                for n in self.numbers:
+                    yield template.format(word=word, n=n)
+            else:
+                yield template.format(word=word)
+
+    def expand(self, wildcard):
+        """Candidats d'un wildcard ("*.example.com"), racine comprise (générateur)."""
+        root = wildcard[2:] if wildcard.startswith("*.") else wildcard
+        yield root
+        for word in self._words():
+            for prefix in self._prefixes(word):
+                prefix = to_ascii(prefix)
+                if prefix and all(LABEL_RE.fullmatch(label) for label in prefix.split(".")):
+                    yield f"{prefix}.{root}"
+
+    def passive_hosts(self, scope):
+        """Noms des sources passives couverts par un wildcard de `scope` (ScopeTrie)."""
+        for path in self.passive:
+            for name in iter_passive_hosts(path):
+                if name.startswith("*."):
+                    name = name[2:]
+                host = to_ascii(name.strip().rstrip("."))
+                if host and scope.is_covered(host):
+                    yield host
+
+    def candidates(self, scope):
+        """
+        Tous les candidats d'un ScopeTrie (générateur) : noms passifs d'abord (déjà
+        observés), puis racines des wildcards, puis expansion de chaque wildcard. Les
+        hôtes explicites du scope, les noms passifs et les racines ne sont pas regénérés :
+        avec *.example.com et *.api.example.com, api.example.com n'est produit qu'une fois.
+        La mémoire reste bornée par le nombre de noms passifs et de wildcards.
+        """
+        seen = set()
+        for host in self.passive_hosts(scope):
+            if host not in seen and host not in scope:
+                seen.add(host)
+                yield host
+        roots = dict.fromkeys(wildcard[2:] for wildcard in scope.wildcards())
+        for root in roots:
+            if root not in seen and root not in scope:
+                yield root
+        for wildcard in scope.wildcards():
+            for host in self.expand(wildcard):
+                if host not in seen and host not in roots and host not in scope:
+                    yield host
+
+
+DEFAULT_EXPANDER = WildcardExpander()
+
+
+def expand_wildcard(domain, expander=DEFAULT_EXPANDER):
     """
     Essaie de dériver des sous-domaines communs à partir d’un wildcard (*.domain.tld)
     """
     if not domain.startswith("*."):
         return [domain]
-    root = domain.replace("*.", "")
-    common_subs = [
-        "www", "api", "app", "dev", "staging", "test", "portal", "login",
-        "dashboard", "beta", "mail", "cdn"
-    ]
-    return [f"{sub}.{root}" for sub in common_subs] + [root]
+    return list(expander.expand(domain))
+
+
+# === Détection des wildcards DNS === #
+
+def resolve_ips(domain):
+    """Adresses IPv4 de `domain` (frozenset vide si le nom ne résout pas)."""
+    try:
+        return frozenset(socket.gethostbyname_ex(domain)[2])
+    except (OSError, UnicodeError):
+        return frozenset()
+
+
+def resolve_record(domain):
+    """
+    Résolution via le résolveur du système, au format d'AsyncResolver.resolve()
+    (IPv4 uniquement, TTL inconnu, nom canonique comme chaîne CNAME).
+    """
+    record = {"domain": domain, "a": [], "aaaa": [], "cname": [], "ttl": None,
+              "rcode": "NOERROR", "latency": 0.0}
+    t0 = time.perf_counter()
+    try:
+        canonical, _, ips = socket.gethostbyname_ex(domain)
+        record["a"] = ips
+        if canonical.lower() != domain:
+            record["cname"] = [canonical.lower()]
+    except socket.gaierror as e:
+        record["rcode"] = "NXDOMAIN" if e.errno == socket.EAI_NONAME else "SERVFAIL"
+    except (OSError, UnicodeError):
+        record["rcode"] = "SERVFAIL"
+    record["latency"] = round((time.perf_counter() - t0) * 1000, 2)
+    return record
+
+
+class _CacheWriter:
+    """Tampon d'écriture vers le DNSCache (écritures groupées, depuis le thread principal)."""
+
+    def __init__(self, cache, batch=500):
+        self.cache = cache
+        self.batch = batch
+        self.records = []
+
+    def add(self, record):
+        if self.cache is not None and record is not None:
+            self.records.append(record)
+            if len(self.records) >= self.batch:
+                self.flush()
+
+    def flush(self):
+        if self.cache is not None and self.records:
+            self.cache.put_many(self.records)
+            self.records = []
+
+
+class WildcardDetector:
+    """
+    Détection des zones à enregistrement DNS wildcard ("*.zone IN A ...").
+    Pour chaque zone parente d'un candidat, `probes` labels aléatoires sont résolus une
+    seule fois ; l'ensemble des réponses est mis en cache. Un candidat dont les réponses
+    sont incluses dans cet ensemble est un faux positif garanti de l'expansion.
+    Thread-safe : une zone n'est sondée qu'une fois même si plusieurs threads la demandent.
+    """
+
+    def __init__(self, resolve=resolve_ips, probes=3):
+        self.resolve = resolve
+        self.probes = probes
+        self.filtered = 0
+        self._answers = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+        self._tasks = {}
+
+    def zone_answers(self, zone):
+        """Réponses (frozenset d'IP) de labels aléatoires sous `zone`, vide si pas de wildcard."""
+        with self._lock:
+            if zone in self._answers:
+                return self._answers[zone]
+            zone_lock = self._locks.setdefault(zone, threading.Lock())
+        with zone_lock:
+            if zone not in self._answers:
+                answers = frozenset()
+                for _ in range(self.probes):
+                    answers |= self.resolve(f"{secrets.token_hex(8)}.{zone}")
+                self._answers[zone] = answers
+        return self._answers[zone]
+
+    async def zone_answers_async(self, zone, resolver):
+        """Variante asyncio de zone_answers() (AsyncResolver) : une tâche partagée par zone."""
+        if zone in self._answers:
+            return self._answers[zone]
+        if zone not in self._tasks:
+            self._tasks[zone] = asyncio.ensure_future(self._probe_async(zone, resolver))
+        return await self._tasks[zone]
+
+    async def _probe_async(self, zone, resolver):
+        records = await asyncio.gather(*(
+            resolver.resolve(f"{secrets.token_hex(8)}.{zone}") for _ in range(self.probes)
+        ))
+        answers = frozenset(ip for r in records for ip in r["a"] + r["aaaa"])
+        self._answers[zone] = answers
+        return answers
+
+    def wildcard_zones(self):
+        """Zones sondées qui ont un wildcard DNS."""
+        return sorted(zone for zone, answers in self._answers.items() if answers)
+
+    @staticmethod
+    def _zone(domain):
+        """Zone parente à sonder, None au-dessus du domaine enregistrable (com, co.uk...)."""
+        zone = domain.split(".", 1)[1] if "." in domain else ""
+        return zone if get_psl().is_valid(zone) else None
+
+    def _matches(self, ips, answers):
+        """Compte et signale un candidat qui ne résout que vers le wildcard de sa zone."""
+        if answers and ips <= answers:
+            with self._lock:
+                self.filtered += 1
+            return True
+        return False
+
+    def is_wildcard_answer(self, domain, ips):
+        """
+        Vrai si les réponses `ips` de `domain` sont celles du wildcard de sa zone parente
+        (compté dans `filtered`).
+        """
+        zone = self._zone(domain)
+        if not ips or zone is None:
+            return False
+        return self._matches(ips, self.zone_answers(zone))
+
+    async def is_wildcard_answer_async(self, domain, ips, resolver):
+        """Variante asyncio d'is_wildcard_answer() (sondages via `resolver`)."""
+        zone = self._zone(domain)
+        if not ips or zone is None:
+            return False
+        return self._matches(ips, await self.zone_answers_async(zone, resolver))
 
 
 # === Core Functions === #
 
-def extract_domains(programs_filename):
+def extract_scope(programs_filename, follow=False):
     """
-    Extrait, nettoie et corrige les domaines depuis un fichier HackerOne JSON.
-    Retourne une liste unique et syntaxiquement valide.
+    Extrait, nettoie et corrige les hôtes et wildcards d'un fichier HackerOne JSON.
+    Retourne un ScopeTrie (requêtes de couverture, arbre compact).
     """
-    domain_pattern = re.compile(r"(?:(?:\*\.)?(?:[a-zA-Z0-9-]+\.)+[a-zA-Z]{2,})")
-    domains = set()
+    # Lecture en flux : programs.json ou programs.ndjson (un programme par ligne)
+    entries = (
+        entry
+        for program, sections in iter_programs(programs_filename, follow=follow)
+        for values in sections.values()
+        if isinstance(values, list)
+        for entry in values
+    )
+    # Normalisation en lot (patterns précompilés + cache)
+    return ScopeTrie(normalize_domains(entries))
 
-    with open(programs_filename, "r", encoding="utf-8") as f:
-        data = json.load(f)
 
-    for program, sections in data.items():
-        for key, values in sections.items():
-            if not isinstance(values, list):
-                continue
-            for entry in values:
-                entry = str(entry)
-                matches = domain_pattern.findall(entry)
-                for match in matches:
-                    norm = normalize_domain(match)
-                    if not norm:
-                        continue
-                    # Expansion des wildcards (très utile pour pentest)
-                    expanded = expand_wildcard(norm)
-                    for d in expanded:
-                        domains.add(d)
+def extract_domains(programs_filename, follow=False, scope=None, expand=False):
+    """
+    Extrait, nettoie et corrige les domaines depuis un fichier HackerOne JSON.
+    Retourne une liste unique et syntaxiquement valide.
+    `scope` : ScopeTrie déjà extrait (évite de relire le fichier).
+    `expand` : ajoute les sous-domaines usuels de chaque wildcard (expand_wildcard) ;
+    désactivé par défaut, l'expansion multiplie le nombre de noms à résoudre (~8x sur
+    le programs.json fourni).
+    """
+    if scope is None:
+        scope = extract_scope(programs_filename, follow=follow)
+    domains = set(scope.hosts())
+    for wildcard in scope.wildcards() if expand else ():
+        # Expansion des wildcards (très utile pour pentest) ; les noms générés
+        # déjà présents explicitement dans le scope ne sont pas dupliqués
+        domains.update(expand_wildcard(wildcard))
     return sorted(domains)
 
 
-def check_domains(domains_list, max_threads=100):
+def check_domains(domains_list, max_threads=100, detector=None, keep=(), engine="threads",
+                  nameservers=None, timeout=2.0, retries=2, concurrency=1000, cache=None,
+                  records=False):
     """
     Vérifie les domaines actifs via résolution DNS multithreadée.
-    Retourne la liste des domaines résolvables.
+    Retourne la liste des domaines résolvables, ou avec `records=True` la liste de leurs
+    enregistrements {"domain", "a", "aaaa", "cname", "ttl", "rcode", "latency"}.
+    `engine` : "threads" (résolveur du système, gethostbyname_ex) ou "async" (client
+    DNS UDP asyncio : `nameservers` "hôte[:port]", `timeout` et `retries` par requête,
+    `concurrency` requêtes en vol ; un domaine est actif s'il a une réponse A ou AAAA).
+    `domains_list` peut être un générateur (candidats d'expansion) : il est consommé
+    au fil de l'eau, avec au plus max_threads * 4 résolutions en attente.
+    `detector` : WildcardDetector ; les domaines qui ne résolvent que vers le wildcard
+    DNS de leur zone sont écartés, sauf ceux présents dans `keep` (hôtes explicites).
+    `cache` : DNSCache ; les entrées non expirées ne sont pas résolues à nouveau, les
+    nouvelles résolutions y sont enregistrées.
     """
+    if engine == "async":
+        return asyncio.run(_check_domains_async(
+            domains_list, detector, keep, concurrency, cache, records,
+            nameservers=nameservers, timeout=timeout, retries=retries,
+        ))
+    if engine != "threads":
+        raise ValueError(f"moteur DNS inconnu : {engine!r}")
+
     active = []
+    window = max_threads * 4
+    writer = _CacheWriter(cache)
 
-    def resolve(domain):
-        try:
-            socket.gethostbyname(domain)
-            return domain
-        except Exception:
-            return None
+    def check(domain, record):
+        fresh = record is None
+        if fresh:
+            record = resolve_record(domain)
+        ips = frozenset(record["a"] + record["aaaa"])
+        alive = bool(ips) and not (
+            detector and domain not in keep and detector.is_wildcard_answer(domain, ips)
+        )
+        return record, fresh, alive
+
+    def collect(futures):
+        for future in futures:
+            record, fresh, alive = future.result()
+            if fresh:
+                writer.add(record)
+            if alive:
+                active.append(record if records else record["domain"])
 
     with concurrent.futures.ThreadPoolExecutor(max_workers=max_threads) as executor:
-        results = list(executor.map(resolve, domains_list))
+        pending = set()
+        for domain in domains_list:
+            record = cache.get(domain) if cache else None
+            # Réponse négative encore valide : rien à faire
+            if record and not (record["a"] or record["aaaa"]):
+                continue
+            pending.add(executor.submit(check, domain, record))
+            if len(pending) >= window:
+                done, pending = concurrent.futures.wait(
+                    pending, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                collect(done)
+        collect(concurrent.futures.as_completed(pending))
+    writer.flush()
+    return active
 
-    for r in results:
-        if r:
-            active.append(r)
+
+async def _check_domains_async(domains_list, detector, keep, concurrency, cache, records,
+                               **resolver_options):
+    """Moteur "async" de check_domains() : au plus `concurrency` domaines en cours."""
+    active = []
+    writer = _CacheWriter(cache)
+    async with AsyncResolver(concurrency=concurrency, **resolver_options) as resolver:
+
+        async def check(domain, record):
+            if record is None:
+                record = await resolver.resolve(domain)
+                writer.add(record)
+            ips = frozenset(record["a"] + record["aaaa"])
+            if not ips:
+                return
+            if detector and domain not in keep and await detector.is_wildcard_answer_async(domain, ips, resolver):
+                return
+            active.append(record if records else domain)
+
+        # Producteur borné par un sémaphore : O(1) par domaine, quel que soit le nombre en vol
+        slots = asyncio.Semaphore(concurrency)
+        pending = set()
+        for domain in domains_list:
+            record = cache.get(domain) if cache else None
+            if record and not (record["a"] or record["aaaa"]):
+                continue
+            await slots.acquire()
+            task = asyncio.ensure_future(check(domain, record))
+            task.add_done_callback(lambda _: slots.release())
+            task.add_done_callback(pending.discard)
+            pending.add(task)
+        await asyncio.gather(*pending)
+    writer.flush()
     return active
 
 
-def clean_domains(programs_filename="programs.json"):
+# Colonnes des enregistrements de résolution (JSONL / CSV)
+RECORD_FIELDS = ("domain", "a", "aaaa", "cname", "ttl", "rcode", "latency")
+
+
+def write_records(records, path):
+    """
+    Enregistre les résolutions dans `path` : JSONL (un objet par ligne) ou, si le nom
+    finit par .csv, CSV (adresses et chaîne CNAME séparées par des espaces).
+    """
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        if path.endswith(".csv"):
+            writer = csv.writer(f)
+            writer.writerow(RECORD_FIELDS)
+            for r in records:
+                writer.writerow([
+                    " ".join(r[k]) if isinstance(r.get(k), list) else r.get(k, "")
+                    for k in RECORD_FIELDS
+                ])
+        else:
+            for r in records:
+                f.write(json.dumps({k: r.get(k) for k in RECORD_FIELDS}, ensure_ascii=False) + "\n")
+
+
+def load_records(path):
+    """Relit un fichier écrit par write_records() : {domaine: enregistrement}."""
+    out = {}
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.endswith(".csv"):
+            for row in csv.DictReader(f):
+                for key in ("a", "aaaa", "cname"):
+                    row[key] = row[key].split()
+                row["ttl"] = int(row["ttl"]) if row["ttl"] else None
+                row["latency"] = float(row["latency"] or 0)
+                out[row["domain"]] = row
+        else:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    out[record["domain"]] = record
+    return out
+
+
+def clean_domains(programs_filename="programs.json", expander=None, wildcard_filter=True,
+                  engine="threads", dns_cache=DNS_CACHE_FILE, records_file="domains.jsonl",
+                  follow=False, **dns_options):
     """
     Combine extraction + correction + vérification DNS + sauvegarde.
+    `expander` : WildcardExpander (wordlists, permutations, sources passives) ; ses
+    candidats sont générés paresseusement et passés directement à check_domains().
+    `wildcard_filter` : écarte les candidats qui ne résolvent que via un wildcard DNS.
+    `engine` et `dns_options` (nameservers, timeout, retries, concurrency) : voir check_domains().
+    `dns_cache` : fichier du cache DNS SQLite partagé avec l'étape 3 (None = pas de cache).
+    `records_file` : résolutions détaillées des domaines actifs (.jsonl ou .csv, None = non écrit).
+    `follow` : suit programs.ndjson pendant que le scraper l'écrit (voir iter_programs).
     """
     print("📤 Extraction et correction des domaines...")
-    all_domains = extract_domains(programs_filename)
-    print(f"→ {len(all_domains)} domaines uniques (corrigés).")
+    scope = extract_scope(programs_filename, follow=follow)
+    covered = len(scope.hosts()) - len(scope.uncovered_hosts())
+    print(f"→ {len(scope.wildcards())} wildcards, {covered} hôtes déjà couverts par un wildcard.")
+    if expander is None:
+        all_domains = extract_domains(programs_filename, scope=scope)
+        print(f"→ {len(all_domains)} domaines uniques (corrigés).")
+    else:
+        # Génération paresseuse : la liste complète des candidats n'est jamais construite
+        all_domains = chain(scope.hosts(), expander.candidates(scope))
+        print(f"→ {len(scope.hosts())} hôtes explicites + candidats générés à la volée.")
+
+    # Arbre compact du scope (hôtes "$" et wildcards "*" par label inversé)
+    with open("scope_tree.json", "w", encoding="utf-8") as f:
+        json.dump(scope.to_dict(), f, ensure_ascii=False)
 
-    print("🌐 Vérification DNS en parallèle (threads)...")
-    active = check_domains(all_domains)
+    print(f"🌐 Vérification DNS en parallèle ({engine})...")
+    detector = WildcardDetector() if wildcard_filter else None
+    cache = DNSCache(dns_cache) if dns_cache else None
+    try:
+        resolved = check_domains(all_domains, detector=detector, keep=scope, engine=engine,
+                                 cache=cache, records=True, **dns_options)
+    finally:
+        if cache:
+            cache.purge()
+            cache.close()
+    # Un même nom peut encore venir de deux wildcards (gabarits à plusieurs labels)
+    resolved = list({r["domain"]: r for r in resolved}.values())
+    active = [r["domain"] for r in resolved]
     print(f"✅ {len(active)} domaines actifs détectés.")
+    if detector:
+        print(f"→ {detector.filtered} candidats écartés (wildcard DNS sur "
+              f"{len(detector.wildcard_zones())} zones).")
 
     with open("domains.txt", "w", encoding="utf-8") as f:
         f.write("\n".join(sorted(set(active))))
 
     print("💾 Fichier 'domains.txt' créé avec succès.")
 
+    if records_file:
+        write_records(sorted(resolved, key=lambda r: r["domain"]), records_file)
+        print(f"💾 Résolutions détaillées (IP, CNAME, latence) dans '{records_file}'.")
+
+
+def _parse_numbers(spec):
+    """ "3" -> range(1, 4), "0-9" -> range(0, 10) """
+    start, _, end = spec.partition("-")
+    return range(int(start), int(end) + 1) if end else range(1, int(start) + 1)
+
 
 # === CLI Entrypoint === #
 if __name__ == "__main__":
-    clean_domains("programs.json")
+    parser = argparse.ArgumentParser(description="Nettoyage et vérification des domaines HackerOne")
+    parser.add_argument("programs", nargs="?", default="programs.json",
+                        help="programs.json ou programs.ndjson")
+    parser.add_argument("--follow", action="store_true",
+                        help="suit programs.ndjson pendant que le scraper l'écrit encore")
+    parser.add_argument("--expand-wildcards", action="store_true",
+                        help="génère les sous-domaines usuels (www, api, dev...) de chaque wildcard du scope")
+    parser.add_argument("-w", "--wordlist", action="append", default=[],
+                        help="wordlist de sous-domaines (lue en flux, option répétable)")
+    parser.add_argument("-p", "--permutation", action="append", default=[],
+                        help='gabarit de permutation : "dev-{word}", "{word}-staging", "{word}{n}"')
+    parser.add_argument("-n", "--numbers", type=_parse_numbers, default=range(0),
+                        help='valeurs de {n} : "3" (1..3) ou "0-9"')
+    parser.add_argument("--passive", action="append", default=[],
+                        help="source passive locale (export crt.sh .json, .jsonl, ou texte)")
+    parser.add_argument("--no-wildcard-filter", action="store_true",
+                        help="garder les candidats qui ne résolvent que via un wildcard DNS")
+    parser.add_argument("--engine", choices=("threads", "async"), default="threads",
+                        help="résolution DNS : threads (résolveur système) ou client UDP asyncio")
+    parser.add_argument("--nameserver", action="append", default=None,
+                        help='serveur de noms du moteur async, "hôte[:port]" (répétable, défaut : resolv.conf)')
+    parser.add_argument("--dns-timeout", type=float, default=2.0, help="timeout par requête DNS (s)")
+    parser.add_argument("--dns-retries", type=int, default=2, help="essais supplémentaires par requête")
+    parser.add_argument("--concurrency", type=int, default=1000, help="requêtes DNS en vol (moteur async)")
+    parser.add_argument("--dns-cache", default=DNS_CACHE_FILE,
+                        help="cache DNS SQLite partagé avec l'étape 3 (défaut : %(default)s)")
+    parser.add_argument("--no-dns-cache", action="store_true", help="désactive le cache DNS")
+    parser.add_argument("--records", default="domains.jsonl",
+                        help="résolutions détaillées des domaines actifs, .jsonl ou .csv (défaut : %(default)s)")
+    args = parser.parse_args()
+
+    expander = DEFAULT_EXPANDER if args.expand_wildcards else None
+    if args.wordlist or args.permutation or args.passive:
+        expander = WildcardExpander(
+            wordlists=args.wordlist,
+            permutations=["{word}"] + args.permutation,
+            numbers=args.numbers,
+            passive=args.passive,
+        )
+    clean_domains(
+        args.programs, expander, wildcard_filter=not args.no_wildcard_filter,
+        engine=args.engine, nameservers=args.nameserver, timeout=args.dns_timeout,
+        retries=args.dns_retries, concurrency=args.concurrency,
+        dns_cache=None if args.no_dns_cache else args.dns_cache, records_file=args.records,
+        follow=args.follow,
+    )
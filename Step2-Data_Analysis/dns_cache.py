@@ -0,0 +1,108 @@
+"""
+Cache DNS persistant (SQLite) partagé entre les étapes du pipeline.
+
+check_domains() y enregistre chaque résolution avec son TTL (réponses positives) ou
+un TTL court (NXDOMAIN, timeout...). Les exécutions suivantes et l'étape 3
+(active_targets_v3.py lit le même fichier) réutilisent les adresses tant qu'elles
+n'ont pas expiré, au lieu de résoudre à nouveau des milliers de noms.
+
+Usage :
+    with DNSCache("dns_cache.sqlite") as cache:
+        record = cache.get("www.example.com")   # None si absent ou expiré
+        cache.put(record)
+"""
+
+import json
+import sqlite3
+import time
+
+DNS_CACHE_FILE = "dns_cache.sqlite"
+# Réponses négatives mises en cache (NOERROR sans adresse = NODATA) ; SERVFAIL et
+# timeouts sont transitoires et seront réessayés à la prochaine exécution
+NEGATIVE_RCODES = ("NXDOMAIN", "NOERROR")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS dns (
+    domain  TEXT PRIMARY KEY,
+    a       TEXT NOT NULL,      -- liste JSON des adresses IPv4
+    aaaa    TEXT NOT NULL,      -- liste JSON des adresses IPv6
+    cname   TEXT NOT NULL,      -- chaîne CNAME (liste JSON)
+    rcode   TEXT NOT NULL,
+    expires REAL NOT NULL,      -- horodatage d'expiration (epoch)
+    updated REAL NOT NULL
+)
+"""
+
+
+class DNSCache:
+    """
+    Cache DNS SQLite.
+    - default_ttl : TTL des réponses positives sans TTL connu (résolveur système)
+    - negative_ttl : TTL des réponses négatives (NXDOMAIN, NODATA)
+    - min_ttl / max_ttl : bornes appliquées aux TTL annoncés
+    """
+
+    def __init__(self, path=DNS_CACHE_FILE, default_ttl=3600, negative_ttl=300,
+                 min_ttl=60, max_ttl=86400):
+        self.path = path
+        self.default_ttl = default_ttl
+        self.negative_ttl = negative_ttl
+        self.min_ttl = min_ttl
+        self.max_ttl = max_ttl
+        self._db = sqlite3.connect(path)
+        self._db.execute(SCHEMA)
+        self._db.commit()
+
+    def close(self):
+        self._db.commit()
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _ttl(self, record):
+        if not (record["a"] or record["aaaa"]):
+            return self.negative_ttl
+        if record.get("ttl") is None:
+            return self.default_ttl
+        return max(self.min_ttl, min(self.max_ttl, record["ttl"]))
+
+    def get(self, domain, now=None):
+        """Enregistrement en cache de `domain` (voir AsyncResolver.resolve), None si absent/expiré."""
+        row = self._db.execute(
+            "SELECT domain, a, aaaa, cname, rcode, expires FROM dns WHERE domain = ? AND expires > ?",
+            (domain, now or time.time()),
+        ).fetchone()
+        if row is None:
+            return None
+        return {
+            "domain": row[0], "a": json.loads(row[1]), "aaaa": json.loads(row[2]),
+            "cname": json.loads(row[3]), "rcode": row[4],
+            "ttl": int(row[5] - (now or time.time())), "latency": 0.0, "cached": True,
+        }
+
+    def put_many(self, records, now=None):
+        """Enregistre des résolutions (dicts "domain", "a", "aaaa", "cname", "rcode", "ttl")."""
+        now = now or time.time()
+        self._db.executemany(
+            "INSERT OR REPLACE INTO dns VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (r["domain"], json.dumps(r["a"]), json.dumps(r["aaaa"]), json.dumps(r.get("cname", [])),
+                 r.get("rcode", "NOERROR"), now + self._ttl(r), now)
+                for r in records
+                if r["a"] or r["aaaa"] or r.get("rcode", "NOERROR") in NEGATIVE_RCODES
+            ],
+        )
+        self._db.commit()
+
+    def put(self, record, now=None):
+        self.put_many([record], now)
+
+    def purge(self, now=None):
+        """Supprime les entrées expirées ; retourne leur nombre."""
+        cursor = self._db.execute("DELETE FROM dns WHERE expires <= ?", (now or time.time(),))
+        self._db.commit()
+        return cursor.rowcount
@@ -0,0 +1,95 @@
+"""
+Lecture des fichiers de scopes produits par le scraper de l'étape 1.
+
+Partagé par clean_hackerone_domains.py et clean_hackerone_domains_v2.py (un seul
+lecteur NDJSON au lieu d'une copie par script).
+
+Usage :
+    for handle, sections in iter_programs("programs.ndjson", follow=True):
+        ...
+"""
+
+import os
+import json
+import time
+
+# Intervalle de scrutation du fichier suivi (secondes)
+POLL_INTERVAL = 0.5
+
+
+def _parse_line(line):
+    """Entrée JSON d'une ligne complète, ou None (ligne vide ou tronquée par un crash)."""
+    try:
+        entry = json.loads(line)
+    except ValueError:
+        return None
+    return entry if isinstance(entry, dict) else None
+
+
+def _restarted(f, path):
+    """Le fichier suivi a été vidé ou remplacé (nouveau run, réécriture finale du scraper)."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return False
+    return st.st_ino != os.fstat(f.fileno()).st_ino or st.st_size < f.tell()
+
+
+def iter_programs(programs_filename, follow=False, idle_timeout=30.0):
+    """
+    Itère sur les programmes (handle, sections) d'un fichier de scopes.
+    - .ndjson / .jsonl : lecture en flux, une ligne = {"handle": ..., "scope": {...}},
+      mémoire constante. La ligne de fin {"end": true} du scraper arrête la lecture ;
+      les lignes illisibles (tronquées par un crash) sont ignorées.
+      Avec follow=True, suit le fichier pendant que le scraper l'écrit : attend qu'il
+      existe, repart du début s'il est vidé ou remplacé (des programmes déjà lus peuvent
+      alors être relus), et s'arrête sur la ligne de fin, ou après idle_timeout secondes
+      sans nouvelle ligne.
+    - sinon : programs.json classique, chargé en entier.
+    """
+    if not programs_filename.endswith((".ndjson", ".jsonl")):
+        with open(programs_filename, "r", encoding="utf-8") as f:
+            yield from json.load(f).items()
+        return
+
+    f = None
+    pending = b""
+    waited = 0.0
+    try:
+        while True:
+            if f is None:
+                try:
+                    f = open(programs_filename, "rb")
+                except FileNotFoundError:
+                    # Le scraper crée le fichier au début de son run
+                    if not follow:
+                        raise
+            chunk = f.readline() if f else b""
+            if chunk:
+                pending += chunk
+                # Ligne en cours d'écriture : on attend la suite
+                if not pending.endswith(b"\n"):
+                    continue
+                entry, pending, waited = _parse_line(pending.decode("utf-8", "replace")), b"", 0.0
+                if entry is None:
+                    continue
+                if entry.get("end"):
+                    return
+                if "handle" in entry:
+                    yield entry["handle"], entry.get("scope") or {}
+                continue
+            if not follow or waited >= idle_timeout:
+                break
+            if f and _restarted(f, programs_filename):
+                f.close()
+                f, pending = None, b""
+                continue
+            time.sleep(POLL_INTERVAL)
+            waited += POLL_INTERVAL
+        # Dernière ligne sans retour à la ligne
+        entry = _parse_line(pending.decode("utf-8", "replace")) if pending.strip() else None
+        if entry and "handle" in entry:
+            yield entry["handle"], entry.get("scope") or {}
+    finally:
+        if f:
+            f.close()
@@ -0,0 +1,124 @@
+"""
+Public Suffix List hors ligne (https://publicsuffix.org/).
+
+La liste est fournie avec le projet (public_suffix_list.dat) et chargée dans un trie
+de labels inversés ("www.example.co.uk" -> uk -> co -> example -> www). Une recherche
+coûte O(nombre de labels), sans aucun accès réseau.
+
+Usage :
+    psl = get_psl()
+    psl.public_suffix("www.example.co.uk")       # 'co.uk'
+    psl.registrable_domain("www.example.co.uk")  # 'example.co.uk'
+    psl.is_valid("foo.invalidtld")               # False
+"""
+
+from functools import lru_cache
+from pathlib import Path
+
+PSL_FILE = Path(__file__).resolve().parent / "public_suffix_list.dat"
+
+# Clés spéciales d'un nœud du trie
+_RULE = "$"        # une règle se termine sur ce nœud
+_EXCEPTION = "!"   # règle d'exception ("!www.ck")
+_WILDCARD = "*"    # règle wildcard ("*.ck")
+
+
+def _to_ascii(rule):
+    """Convertit une règle Unicode en A-labels (punycode), None si impossible."""
+    try:
+        return ".".join(
+            label if label == _WILDCARD else label.encode("idna").decode("ascii")
+            for label in rule.split(".")
+        )
+    except UnicodeError:
+        return None
+
+
+class PublicSuffixList:
+    """
+    Trie des règles de la Public Suffix List.
+    Contrairement à l'algorithme officiel, un TLD absent de la liste n'est PAS couvert
+    par la règle implicite "*" : le nom est considéré comme invalide.
+    """
+
+    def __init__(self, path=PSL_FILE, private=True):
+        """
+        :param path: fichier au format public_suffix_list.dat
+        :param private: inclure la section PRIVATE (github.io, herokuapp.com, ...)
+        """
+        self._root = {}
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line.startswith("// ===BEGIN PRIVATE DOMAINS===") and not private:
+                    break
+                if not line or line.startswith("//"):
+                    continue
+                rule = line.split()[0].lower()
+                self._add(rule)
+                # Règles Unicode : ajout aussi de la forme punycode
+                if not rule.isascii():
+                    ascii_rule = _to_ascii(rule.lstrip(_EXCEPTION))
+                    if ascii_rule:
+                        self._add(_EXCEPTION + ascii_rule if rule.startswith(_EXCEPTION) else ascii_rule)
+
+    def _add(self, rule):
+        exception = rule.startswith(_EXCEPTION)
+        node = self._root
+        for label in reversed(rule.lstrip(_EXCEPTION).split(".")):
+            node = node.setdefault(label, {})
+        node[_EXCEPTION if exception else _RULE] = True
+
+    def _suffix_len(self, labels):
+        """Nombre de labels du suffixe public de `labels` (liste inversée), 0 si TLD inconnu."""
+        node = self._root
+        best = 0
+        for depth, label in enumerate(labels, 1):
+            wildcard = node.get(_WILDCARD)
+            if wildcard is not None and _RULE in wildcard:
+                best = depth
+            child = node.get(label)
+            if child is None:
+                break
+            # Une exception l'emporte : le suffixe est le parent
+            if _EXCEPTION in child:
+                return depth - 1
+            if _RULE in child:
+                best = depth
+            node = child
+        return best
+
+    def _split(self, host):
+        host = host.strip().rstrip(".").lower()
+        labels = host.split(".")
+        if not host or "" in labels:
+            return None, 0
+        labels.reverse()
+        return labels, self._suffix_len(labels)
+
+    def public_suffix(self, host):
+        """Suffixe public de `host` ('co.uk'), ou None si le TLD est inconnu."""
+        labels, n = self._split(host)
+        if not n:
+            return None
+        return ".".join(reversed(labels[:n]))
+
+    def registrable_domain(self, host):
+        """
+        Domaine enregistrable (suffixe public + un label) : 'example.co.uk'.
+        None si le TLD est inconnu ou si `host` est lui-même un suffixe public.
+        """
+        labels, n = self._split(host)
+        if not n or len(labels) <= n:
+            return None
+        return ".".join(reversed(labels[:n + 1]))
+
+    def is_valid(self, host):
+        """Vrai si `host` a un TLD connu et n'est pas lui-même un suffixe public."""
+        return self.registrable_domain(host) is not None
+
+
+@lru_cache(maxsize=None)
+def get_psl(path=PSL_FILE, private=True):
+    """Instance partagée (la liste n'est chargée qu'une fois par processus)."""
+    return PublicSuffixList(path, private)
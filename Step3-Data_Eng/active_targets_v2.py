@@ -11,6 +11,9 @@ Vérifie quels domaines listés dans domains.txt sont actifs pour :
 
 Bonus : chaque vérification peut utiliser un port spécifique en paramètre.
 Résultats : http.txt, https.txt, ssh.txt
+
+Version historique, non maintenue : voir active_targets_v3.py (moteur asyncio,
+passe unique, listes de ports).
 """
 
 import socket
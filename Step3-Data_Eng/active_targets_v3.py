@@ -13,9 +13,20 @@ Demande à l'utilisateur quel port scanner pour chaque service.
 Résultats : http.txt, https.txt, ssh.txt
 """
 
+import asyncio
+import csv
+import json
+import os
 import socket
+import sqlite3
+import ssl
+import threading
+import time
+import urllib.parse
+from collections import Counter, deque
+from contextlib import closing
 import requests
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
 # ----- Configuration -----
 INPUT_FILE = "domains.txt"   # Fichier contenant la liste des domaines à tester
@@ -24,31 +35,181 @@ HTTPS_FILE = "https.txt"     # Fichier de sortie pour les domaines HTTPS actifs
 SSH_FILE = "ssh.txt"         # Fichier de sortie pour les domaines SSH actifs
 TIMEOUT = 3                  # Délai d’attente (en secondes)
 MAX_THREADS = 20             # Nombre maximum de threads
+POOL_CONNECTIONS = 4         # Connexions HTTP(S) gardées ouvertes par thread
+ENGINE = "async"             # Moteur de sondes : "async" (asyncio) ou "threads" (requests)
+CONCURRENCY = 1000           # Sondes en vol au maximum (moteur asyncio)
+# Plafonds par protocole pour la passe unique (run_all_checks) : un protocole lent ne
+# monopolise pas toutes les places, les autres avancent en parallèle
+PROTOCOL_CONCURRENCY = {"http": 600, "https": 600, "ssh": 400}  # moteur asyncio
+PROTOCOL_THREADS = {"http": 12, "https": 12, "ssh": 8}           # moteur threads
+HOST_CONCURRENCY = 8         # Sondes en vol au maximum par hôte (et par protocole) : une plage de ports ne martèle pas un seul hôte
+# Pré-filtre TCP : balayage connect() rapide des couples (IP, port) avant HTTP/TLS
+PREFILTER = True
+PREFILTER_TIMEOUT = 1.0      # Délai de connexion du pré-filtre (en secondes)
+PREFILTER_CONCURRENCY = 2000 # Connexions en vol (moteur asyncio)
+PREFILTER_THREADS = 200      # Threads (moteur threads)
+USER_AGENT = "active-targets/1.0"
+# Vérification HTTP(S) : "head" (HEAD, puis GET limité au premier octet si HEAD est refusé,
+# corps jamais téléchargé) ou "get" (GET complet, comportement d'origine)
+LIVENESS = "head"
+HEAD_FALLBACK_STATUSES = (400, 403, 405, 501)  # Réponses à HEAD qui déclenchent le GET de repli
+MAX_REDIRECTS = 5            # Redirections suivies au maximum (les deux moteurs) ; au-delà : inactif
+DNS_CACHE_FILE = "dns_cache.sqlite"  # Cache DNS produit par l'étape 2 (optionnel)
+RECORDS_FILE = "domains.jsonl"       # Résolutions détaillées de l'étape 2 (optionnel, .jsonl ou .csv)
+
+_system_getaddrinfo = socket.getaddrinfo
+
+
+# ----- Cache DNS -----
+def load_dns_cache(path: str = DNS_CACHE_FILE) -> dict:
+    """
+    Charge les résolutions non expirées du cache DNS de l'étape 2.
+    Retourne {domaine: [IP, ...]} ; une liste vide signifie que le domaine n'existe pas.
+    """
+    if not os.path.exists(path):
+        return {}
+    with closing(sqlite3.connect(path)) as db:
+        rows = db.execute("SELECT domain, a, aaaa FROM dns WHERE expires > ?", (time.time(),))
+        return {domain: json.loads(a) + json.loads(aaaa) for domain, a, aaaa in rows}
+
+
+def load_resolution_records(path: str = RECORDS_FILE) -> dict:
+    """
+    Charge les résolutions détaillées écrites par l'étape 2 (domains.jsonl ou .csv) :
+    {domaine: {"domain", "a", "aaaa", "cname", "ttl", "rcode", "latency"}}.
+    """
+    if not os.path.exists(path):
+        return {}
+    records = {}
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.endswith(".csv"):
+            for row in csv.DictReader(f):
+                for key in ("a", "aaaa", "cname"):
+                    row[key] = row[key].split()
+                records[row["domain"]] = row
+        else:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    records[record["domain"]] = record
+    return records
+
+
+def install_dns_cache(entries: dict) -> None:
+    """
+    Branche le cache sur socket.getaddrinfo : requests et socket.create_connection se
+    connectent directement aux IP déjà résolues (SNI et en-tête Host restent le domaine).
+    Les domaines absents du cache passent par le résolveur du système.
+    """
+    def getaddrinfo(host, port, family=0, type=0, proto=0, flags=0):
+        ips = entries.get(host.lower().rstrip(".")) if isinstance(host, str) else None
+        if ips is None:
+            return _system_getaddrinfo(host, port, family, type, proto, flags)
+        if not ips:
+            raise socket.gaierror(socket.EAI_NONAME, "Name or service not known (cache DNS)")
+        infos = []
+        for ip in ips:
+            af = socket.AF_INET6 if ":" in ip else socket.AF_INET
+            if family in (0, af):
+                infos += _system_getaddrinfo(ip, port, af, type, proto, flags | socket.AI_NUMERICHOST)
+        return infos or _system_getaddrinfo(host, port, family, type, proto, flags)
+
+    socket.getaddrinfo = getaddrinfo
 
 
 # ----- Fonctions de vérification -----
+_sessions = threading.local()
+
+
+def _session() -> requests.Session:
+    """
+    Session requests du thread courant : la connexion du HEAD sert au GET de repli et aux
+    redirections vers le même hôte. Le pool ne garde que POOL_CONNECTIONS hôtes par thread
+    (les plus récents) : une sonde par hôte:port n'a rien à réutiliser au-delà, et un pool
+    plus grand garderait des centaines de sockets ouvertes par thread.
+    """
+    session = getattr(_sessions, "session", None)
+    if session is None:
+        session = requests.Session()
+        session.headers["User-Agent"] = USER_AGENT
+        session.max_redirects = MAX_REDIRECTS
+        adapter = requests.adapters.HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=1)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        _sessions.session = session
+    return session
+
+
+def _is_alive(status) -> bool:
+    """Code < 400 ; 416 (Range non satisfaisable, ressource vide) répond aussi."""
+    return status is not None and (status < 400 or status == 416)
+
+
+def _http_alive(url: str, verify: bool = True) -> bool:
+    """
+    Vérifie `url` sans télécharger le corps (LIVENESS = "head") : HEAD, puis GET
+    `Range: bytes=0-0` en streaming si HEAD est refusé ; la réponse est fermée dès les
+    en-têtes reçus. LIVENESS = "get" : GET complet comme avant.
+    """
+    session = _session()
+    if LIVENESS != "head":
+        return _is_alive(session.get(url, timeout=TIMEOUT, verify=verify).status_code)
+    with session.head(url, timeout=TIMEOUT, verify=verify, allow_redirects=True) as r:
+        if r.status_code not in HEAD_FALLBACK_STATUSES:
+            return _is_alive(r.status_code)
+    with session.get(url, timeout=TIMEOUT, verify=verify, stream=True,
+                     headers={"Range": "bytes=0-0"}) as r:
+        return _is_alive(r.status_code)
+
+
+def _check(check_function, host: str, port: int) -> bool:
+    """Enveloppe synchrone : une sonde `check_function` avec le moteur ENGINE."""
+    if ENGINE == "async":
+        return asyncio.run(ASYNC_CHECKS[check_function](host, port))
+    return BLOCKING_CHECKS[check_function](host, port)
+
+
 def http_check(domain: str, port: int = 80) -> bool:
     """Vérifie si le service HTTP est actif sur un port spécifique."""
+    return _check(http_check, domain, port)
+
+
+def https_check(domain: str, port: int = 443) -> bool:
+    """Vérifie si le service HTTPS est actif sur un port spécifique."""
+    return _check(https_check, domain, port)
+
+
+def ssh_check(domain: str, port: int = 22) -> bool:
+    """Vérifie si le port SSH est ouvert sur un port spécifique."""
+    return _check(ssh_check, domain, port)
+
+
+def tcp_check(host: str, port: int) -> bool:
+    """Connexion TCP avec le délai court du pré-filtre (PREFILTER_TIMEOUT)."""
+    return _check(tcp_check, host, port)
+
+
+# ----- Moteur threads (requests, sockets bloquantes) -----
+def http_check_blocking(domain: str, port: int = 80) -> bool:
+    """Sonde bloquante de http_check (requests, redirections suivies)."""
     url = f"http://{domain}:{port}"
     try:
-        r = requests.get(url, timeout=TIMEOUT)
-        return r.status_code < 400
+        return _http_alive(url)
     except Exception:
         return False
 
 
-def https_check(domain: str, port: int = 443) -> bool:
-    """Vérifie si le service HTTPS est actif sur un port spécifique."""
+def https_check_blocking(domain: str, port: int = 443) -> bool:
+    """Sonde bloquante de https_check (certificat non vérifié)."""
     url = f"https://{domain}:{port}"
     try:
-        r = requests.get(url, timeout=TIMEOUT, verify=False)
-        return r.status_code < 400
+        return _http_alive(url, verify=False)
     except Exception:
         return False
 
 
-def ssh_check(domain: str, port: int = 22) -> bool:
-    """Vérifie si le port SSH est ouvert sur un port spécifique."""
+def ssh_check_blocking(domain: str, port: int = 22) -> bool:
+    """Sonde bloquante de ssh_check (connexion TCP)."""
     try:
         with socket.create_connection((domain, port), timeout=TIMEOUT):
             return True
@@ -56,28 +217,557 @@ def ssh_check(domain: str, port: int = 22) -> bool:
         return False
 
 
+def tcp_check_blocking(host: str, port: int) -> bool:
+    """Sonde bloquante de tcp_check."""
+    try:
+        with socket.create_connection((host, port), timeout=PREFILTER_TIMEOUT):
+            return True
+    except Exception:
+        return False
+
+
+# Sonde bloquante correspondant à chaque fonction de vérification
+BLOCKING_CHECKS = {
+    http_check: http_check_blocking,
+    https_check: https_check_blocking,
+    ssh_check: ssh_check_blocking,
+    tcp_check: tcp_check_blocking,
+}
+
+
+# ----- Moteur asyncio -----
+# HTTPS sans vérification du certificat (équivalent de verify=False)
+_INSECURE_SSL = ssl.create_default_context()
+_INSECURE_SSL.check_hostname = False
+_INSECURE_SSL.verify_mode = ssl.CERT_NONE
+
+
+_SECURE_SSL = ssl.create_default_context()
+_REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+
+
+async def _request(reader, writer, method: str, host: str, path: str = "/", headers: str = "",
+                   keep_alive: bool = False):
+    """
+    Envoie une requête HTTP/1.1 minimale et lit la ligne de statut et les en-têtes
+    (jamais le corps). Retourne (code ou None si invalide, connexion réutilisable,
+    en-tête Location ou None).
+    """
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nUser-Agent: {USER_AGENT}\r\nAccept: */*\r\n"
+        f"{headers}Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode()
+    )
+    await writer.drain()
+    lines = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+    parts = lines[0].split()
+    if len(parts) < 2 or not parts[0].startswith("HTTP/") or not parts[1].isdigit():
+        return None, False, None
+    fields = {}
+    for line in lines[1:]:
+        name, _, value = line.partition(":")
+        fields.setdefault(name.strip().lower(), value.strip())
+    connection = fields.get("connection", "").lower()
+    reusable = connection == "keep-alive" or (parts[0] == "HTTP/1.1" and connection != "close")
+    return int(parts[1]), reusable, fields.get("location")
+
+
+async def _fetch(url: str, method: str, verify: bool, headers: str = "", conn=None):
+    """
+    `method` sur `url` en suivant au plus MAX_REDIRECTS redirections, comme requests
+    (HEAD reste HEAD, GET reste GET ; au-delà, ou vers un schéma autre que http(s) : None).
+    `conn` = (origine, reader, writer) est repris si la requête va vers la même origine.
+    Retourne (code final ou None, connexion réutilisable ou None) ; seule une connexion
+    après HEAD est gardée (pas de corps à vider), à l'appelant de la fermer.
+    """
+    try:
+        for hop in range(MAX_REDIRECTS + 1):
+            parts = urllib.parse.urlsplit(url)
+            if parts.scheme not in ("http", "https") or not parts.hostname:
+                break
+            use_ssl = parts.scheme == "https"
+            default_port = 443 if use_ssl else 80
+            origin = (parts.scheme, parts.hostname, parts.port or default_port)
+            if conn is None or conn[0] != origin:
+                if conn:
+                    conn[2].close()
+                context = (_SECURE_SSL if verify else _INSECURE_SSL) if use_ssl else None
+                conn = (origin, *await asyncio.open_connection(
+                    origin[1], origin[2], ssl=context, server_hostname=origin[1] if use_ssl else None))
+            host = origin[1] if origin[2] == default_port else f"{origin[1]}:{origin[2]}"
+            path = urllib.parse.quote(urllib.parse.urlunsplit(("", "", parts.path or "/", parts.query, "")),
+                                      safe="!#$%&'()*+,/:;=?@[]~")
+            status, reusable, location = await _request(conn[1], conn[2], method, host, path, headers,
+                                                        keep_alive=method == "HEAD")
+            if not reusable or method != "HEAD":
+                conn[2].close()
+                conn = None
+            if status not in _REDIRECT_STATUSES or location is None:
+                return status, conn
+            if hop < MAX_REDIRECTS:
+                url = urllib.parse.urljoin(url, location)
+    except BaseException:
+        if conn:
+            conn[2].close()
+        raise
+    if conn:
+        conn[2].close()
+    return None, None
+
+
+async def _http_status(domain: str, port: int, use_ssl: bool, verify: bool):
+    """
+    Code HTTP de `/` après redirections (None si la réponse est invalide), sans lire le
+    corps. LIVENESS = "head" : HEAD, puis GET `Range: bytes=0-0` sur l'URL de départ si
+    HEAD est refusé (HEAD_FALLBACK_STATUSES), sur la même connexion si possible ;
+    LIVENESS = "get" : GET. `verify` ne s'applique qu'aux connexions TLS (redirections
+    http -> https comprises), comme requests.
+    """
+    url = f"{'https' if use_ssl else 'http'}://{domain}:{port}"
+    if LIVENESS != "head":
+        return (await _fetch(url, "GET", verify))[0]
+    status, conn = await _fetch(url, "HEAD", verify)
+    try:
+        if status not in HEAD_FALLBACK_STATUSES:
+            return status
+        status, conn = await _fetch(url, "GET", verify, "Range: bytes=0-0\r\n", conn)
+        return status
+    finally:
+        if conn:
+            conn[2].close()
+
+
+# Erreurs d'une sonde HTTP(S) asyncio (connexion, TLS, réponse tronquée ou invalide)
+_HTTP_ERRORS = (OSError, EOFError, asyncio.TimeoutError, asyncio.LimitOverrunError, UnicodeError, ValueError)
+
+
+async def http_check_async(domain: str, port: int = 80) -> bool:
+    """Équivalent asyncio de http_check (redirections suivies, comme requests)."""
+    try:
+        status = await asyncio.wait_for(_http_status(domain, port, False, True), TIMEOUT)
+    except _HTTP_ERRORS:
+        return False
+    return _is_alive(status)
+
+
+async def https_check_async(domain: str, port: int = 443) -> bool:
+    """Équivalent asyncio de https_check (certificat non vérifié, SNI = domaine)."""
+    try:
+        status = await asyncio.wait_for(_http_status(domain, port, True, False), TIMEOUT)
+    except _HTTP_ERRORS:
+        return False
+    return _is_alive(status)
+
+
+async def _connect_async(host: str, port: int, timeout: float) -> bool:
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    except (OSError, asyncio.TimeoutError, UnicodeError):
+        return False
+    writer.close()
+    return True
+
+
+async def ssh_check_async(domain: str, port: int = 22) -> bool:
+    """Équivalent asyncio de ssh_check (connexion TCP)."""
+    return await _connect_async(domain, port, TIMEOUT)
+
+
+async def tcp_check_async(host: str, port: int) -> bool:
+    """Équivalent asyncio de tcp_check."""
+    return await _connect_async(host, port, PREFILTER_TIMEOUT)
+
+
+# Sonde asyncio correspondant à chaque fonction de vérification
+ASYNC_CHECKS = {
+    http_check: http_check_async,
+    https_check: https_check_async,
+    ssh_check: ssh_check_async,
+    tcp_check: tcp_check_async,
+}
+
+
+async def _scan_async(jobs, on_result, limits, concurrency, host_limit):
+    """
+    Moteur asyncio de scan() : un producteur par protocole, borné par son plafond
+    (`limits`) et par le plafond global `concurrency` (sémaphores). Au-delà de
+    `host_limit` sondes en vol sur un hôte, ses cibles sont mises de côté et reprises
+    par ses sondes en cours à mesure qu'elles se terminent : le producteur continue
+    avec les autres hôtes au lieu d'attendre.
+    """
+    total = asyncio.Semaphore(concurrency)
+
+    async def feed(protocol, check_async, targets):
+        slots = asyncio.Semaphore(limits.get(protocol, concurrency))
+        running = Counter()   # hôte -> sondes en vol
+        deferred = {}         # hôte -> ports en attente
+        pending = set()
+
+        async def probe(host, port):
+            try:
+                while True:
+                    on_result(protocol, host, port, await check_async(host, port))
+                    queue = deferred.get(host)
+                    if not queue:
+                        break
+                    port = queue.popleft()
+                    if not queue:
+                        del deferred[host]
+            finally:
+                running[host] -= 1
+                if not running[host]:
+                    del running[host]
+                slots.release()
+                total.release()
+
+        for host, port in targets:
+            if running[host] >= host_limit:
+                deferred.setdefault(host, deque()).append(port)
+                continue
+            await slots.acquire()
+            await total.acquire()
+            running[host] += 1
+            task = asyncio.ensure_future(probe(host, port))
+            task.add_done_callback(pending.discard)
+            pending.add(task)
+        await asyncio.gather(*pending)
+
+    await asyncio.gather(*(
+        feed(protocol, ASYNC_CHECKS[check_function], targets)
+        for protocol, (check_function, targets) in jobs.items()
+    ))
+
+
+def _scan_threads(jobs, on_result, limits, max_workers, host_limit):
+    """
+    Moteur threads de scan() : un seul ThreadPoolExecutor, alimenté à tour de rôle par
+    chaque protocole tant qu'il reste sous son plafond (`limits`). Comme en asyncio, les
+    cibles d'un hôte qui a déjà `host_limit` sondes en vol attendent qu'une se termine.
+    """
+    queues = {protocol: iter(targets) for protocol, (_, targets) in jobs.items()}
+    running = dict.fromkeys(jobs, 0)
+    per_host = Counter()   # (protocole, hôte) -> sondes en vol
+    deferred = {}          # (protocole, hôte) -> ports en attente
+    futures = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        def submit(protocol, host, port):
+            check_function = jobs[protocol][0]
+            check = BLOCKING_CHECKS.get(check_function, check_function)
+            futures[executor.submit(check, host, port)] = (protocol, host, port)
+            running[protocol] += 1
+            per_host[protocol, host] += 1
+
+        def fill():
+            progressed = True
+            while progressed and queues and len(futures) < max_workers:
+                progressed = False
+                for protocol in list(queues):
+                    if len(futures) >= max_workers or running[protocol] >= limits.get(protocol, max_workers):
+                        continue
+                    target = next(queues[protocol], None)
+                    if target is None:
+                        del queues[protocol]
+                        continue
+                    host, port = target
+                    if per_host[protocol, host] >= host_limit:
+                        deferred.setdefault((protocol, host), deque()).append(port)
+                    else:
+                        submit(protocol, host, port)
+                    progressed = True
+
+        fill()
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                protocol, host, port = futures.pop(future)
+                running[protocol] -= 1
+                per_host[protocol, host] -= 1
+                if not per_host[protocol, host]:
+                    del per_host[protocol, host]
+                try:
+                    on_result(protocol, host, port, future.result())
+                except Exception as e:
+                    print(f"[-] Erreur lors de la vérification de {host}:{port} → {e}")
+                # La place libérée revient d'abord aux cibles en attente du même hôte
+                queue = deferred.get((protocol, host))
+                if queue:
+                    submit(protocol, host, queue.popleft())
+                    if not queue:
+                        del deferred[protocol, host]
+            fill()
+
+
+def scan(jobs, on_result, engine=None, concurrency=None, max_threads=None, host_limit=None):
+    """
+    Passe unique sur plusieurs protocoles : `jobs` = {protocole: (check_function, cibles)}
+    avec des cibles (hôte, port). Toutes les sondes partagent la même file de travail et
+    on_result(protocole, hôte, port, actif) est appelé au fil des résultats.
+    - engine "async" : sondes asyncio (ASYNC_CHECKS), `concurrency` (CONCURRENCY) en vol,
+      PROTOCOL_CONCURRENCY par protocole
+    - engine "threads" : sondes bloquantes (BLOCKING_CHECKS) dans un ThreadPoolExecutor(`max_threads`
+      ou MAX_THREADS), PROTOCOL_THREADS par protocole
+    - au plus `host_limit` (HOST_CONCURRENCY) sondes en vol par hôte et par protocole
+    """
+    engine = engine or ENGINE
+    host_limit = host_limit or HOST_CONCURRENCY
+    if engine == "async" and all(check in ASYNC_CHECKS for check, _ in jobs.values()):
+        asyncio.run(_scan_async(jobs, on_result, PROTOCOL_CONCURRENCY, concurrency or CONCURRENCY, host_limit))
+    else:
+        _scan_threads(jobs, on_result, PROTOCOL_THREADS, max_threads or MAX_THREADS, host_limit)
+
+
+def probe_many(check_function, targets, on_result, engine=None):
+    """
+    Sonde chaque couple (hôte, port) de `targets` avec `check_function` et appelle
+    on_result(hôte, port, actif) au fil des résultats (scan() avec un seul protocole,
+    sans autre plafond que CONCURRENCY / MAX_THREADS et HOST_CONCURRENCY).
+    """
+    name = check_function.__name__
+    jobs = {name: (check_function, targets)}
+    scan(jobs, lambda _, host, port, ok: on_result(host, port, ok), engine)
+
+
+# ----- Ports -----
+def parse_ports(spec) -> list:
+    """
+    Liste de ports triée et sans doublons à partir d'un entier, d'une liste ou d'une
+    spécification texte : "80,8080,8000-8010". Lève ValueError si un port est invalide.
+    """
+    if isinstance(spec, int):
+        parts = [str(spec)]
+    elif isinstance(spec, str):
+        parts = [p for p in spec.replace(" ", "").split(",") if p]
+    else:
+        parts = [str(p) for p in spec]
+    ports = set()
+    for part in parts:
+        start, sep, end = part.partition("-")
+        low = int(start)
+        high = int(end) if sep else low
+        if not 1 <= low <= high <= 65535:
+            raise ValueError(f"port ou plage invalide : {part}")
+        ports.update(range(low, high + 1))
+    if not ports:
+        raise ValueError("aucun port")
+    return sorted(ports)
+
+
+def format_ports(ports) -> str:
+    """[80, 8000, 8001, 8002] -> "80,8000-8002" """
+    ranges = []
+    for port in sorted(ports):
+        if ranges and port == ranges[-1][1] + 1:
+            ranges[-1][1] = port
+        else:
+            ranges.append([port, port])
+    return ",".join(str(a) if a == b else f"{a}-{b}" for a, b in ranges)
+
+
+def fan_out(hosts, ports):
+    """
+    Cibles (hôte, port) pour chaque hôte et chaque port (générateur), ports en boucle
+    externe : deux cibles consécutives visent des hôtes différents, ce qui répartit la
+    charge et laisse la limite par hôte (HOST_CONCURRENCY) intervenir le moins possible.
+    Les cibles sont produites au fil du scan : 10 000 domaines × une plage de ports ne
+    sont jamais matérialisés. `hosts` est parcouru une fois par port.
+    """
+    for port in ports:
+        for host in hosts:
+            yield host, port
+
+
 # ----- Fonction utilitaire -----
-def run_check(check_function, domains, output_file, port):
-    """Exécute la vérification sur une liste de domaines et sauvegarde les résultats."""
-    print(f"\n[*] Exécution de {check_function.__name__} sur le port {port}...")
+def run_check(check_function, domains, output_file, port, engine=None):
+    """
+    Exécute la vérification sur une liste de domaines et sauvegarde les résultats.
+    `port` : un port, une liste ou une spécification "80,8080,8000-8010" (parse_ports) ;
+    chaque domaine est sondé sur chaque port, dans une seule passe.
+    """
+    ports = parse_ports(port)
+    print(f"\n[*] Exécution de {check_function.__name__} sur le(s) port(s) {format_ports(ports)} "
+          f"({engine or ENGINE})...")
     active = []
 
+    def on_result(domain, port, ok):
+        if ok:
+            print(f"[+] {domain}:{port} est actif")
+            active.append(f"{domain}:{port}")
+
+    probe_many(check_function, fan_out(domains, ports), on_result, engine)
+
+    with open(output_file, "w") as f:
+        f.write("\n".join(active))
+    print(f"[✓] Résultats enregistrés dans {output_file}")
+
+
+# ----- Regroupement par IP -----
+def resolve_domains(domains, dns=None) -> dict:
+    """
+    Adresses de chaque domaine : {domaine: [IP, ...]} ([] s'il ne résout pas).
+    Les entrées du cache DNS de l'étape 2 (`dns`) sont reprises telles quelles, les
+    autres domaines sont résolus en multithreading.
+    """
+    dns = dns or {}
+    resolved = {d: dns[d] for d in domains if dns.get(d)}
+
+    def lookup(domain):
+        try:
+            infos = socket.getaddrinfo(domain, None, type=socket.SOCK_STREAM)
+            return domain, list(dict.fromkeys(info[4][0] for info in infos))
+        except (OSError, UnicodeError):
+            return domain, []
+
+    missing = [d for d in domains if d not in resolved]
     with ThreadPoolExecutor(max_workers=MAX_THREADS) as executor:
-        futures = {executor.submit(check_function, d, port): d for d in domains}
-        for future in as_completed(futures):
-            domain = futures[future]
-            try:
-                if future.result():
-                    print(f"[+] {domain}:{port} est actif")
-                    active.append(f"{domain}:{port}")
-            except Exception as e:
-                print(f"[-] Erreur lors de la vérification de {domain}:{port} → {e}")
+        for domain, ips in executor.map(lookup, missing):
+            resolved[domain] = ips
+    return resolved
+
+
+def group_by_ip(resolved: dict) -> dict:
+    """{domaine: [IP, ...]} -> {IP: [domaines]} (beaucoup de domaines partagent les IP d'un CDN)."""
+    groups = {}
+    for domain, ips in resolved.items():
+        for ip in ips:
+            groups.setdefault(ip, []).append(domain)
+    return groups
+
+
+def run_check_by_ip(check_function, domains, output_file, port, dns=None, engine=None):
+    """
+    Variante de run_check pour les vérifications TCP (ssh_check) : l'accessibilité d'un
+    port ne dépend que de l'IP, donc chaque (IP, port) n'est sondé qu'une fois et le
+    résultat est reporté sur tous les domaines de cette IP. Un domaine est actif si
+    l'une de ses adresses l'est (comme socket.create_connection).
+    `port` accepte les mêmes valeurs que dans run_check.
+    """
+    ports = parse_ports(port)
+    resolved = resolve_domains(domains, dns)
+    by_ip = group_by_ip(resolved)
+    print(f"\n[*] Exécution de {check_function.__name__} sur le(s) port(s) {format_ports(ports)} "
+          f"({len(domains)} domaines → {len(by_ip)} IP uniques)...")
+    open_pairs = set()
+
+    def on_result(ip, port, ok):
+        if ok:
+            open_pairs.add((ip, port))
+
+    probe_many(check_function, fan_out(by_ip, ports), on_result, engine)
+
+    active = []
+    for port in ports:
+        for domain in domains:
+            if any((ip, port) in open_pairs for ip in resolved.get(domain, [])):
+                print(f"[+] {domain}:{port} est actif")
+                active.append(f"{domain}:{port}")
 
     with open(output_file, "w") as f:
         f.write("\n".join(active))
     print(f"[✓] Résultats enregistrés dans {output_file}")
 
 
+# ----- Pré-filtre TCP -----
+def tcp_sweep(pairs, engine=None) -> set:
+    """
+    Balayage connect() rapide des couples (IP, port) : délai court (PREFILTER_TIMEOUT),
+    forte concurrence (PREFILTER_CONCURRENCY / PREFILTER_THREADS). Retourne les couples ouverts.
+    Les ports fermés ou filtrés sont écartés ici, avant toute requête HTTP ou poignée de main TLS.
+    `pairs` (couples distincts, par exemple fan_out(IP, ports)) est parcouru au fil du
+    balayage, sans copie.
+    """
+    open_pairs = set()
+    swept = 0
+    t0 = time.perf_counter()
+
+    def counted():
+        nonlocal swept
+        for pair in pairs:
+            swept += 1
+            yield pair
+
+    def on_result(_, ip, port, ok):
+        if ok:
+            open_pairs.add((ip, port))
+
+    scan({"tcp": (tcp_check, counted())}, on_result, engine,
+         concurrency=PREFILTER_CONCURRENCY, max_threads=PREFILTER_THREADS)
+    print(f"[*] Pré-filtre TCP : {len(open_pairs)}/{swept} couples (IP, port) ouverts "
+          f"en {time.perf_counter() - t0:.1f}s")
+    return open_pairs
+
+
+# ----- Passe unique HTTP / HTTPS / SSH -----
+def run_all_checks(domains, http_port=80, https_port=443, ssh_port=22, dns=None, engine=None):
+    """
+    Lance les trois vérifications dans une seule passe (scan) au lieu de trois passes
+    successives : HTTPS et SSH n'attendent plus la fin des timeouts HTTP. Les cibles
+    actives sont écrites dans http.txt / https.txt / ssh.txt dès qu'elles arrivent.
+    SSH est sondé par IP comme dans run_check_by_ip.
+    Avec PREFILTER, un balayage TCP (tcp_sweep) des IP précède la passe : HTTP et HTTPS
+    ne visent que les domaines dont le port est ouvert sur l'une de leurs adresses, et
+    SSH (une simple connexion TCP) reprend directement les résultats du balayage.
+    Chaque port peut être une liste ou une spécification "80,8080,8000-8010" (parse_ports) :
+    toutes les combinaisons domaine × port passent dans la même file de travail.
+    """
+    http_ports, https_ports, ssh_ports = parse_ports(http_port), parse_ports(https_port), parse_ports(ssh_port)
+    resolved = resolve_domains(domains, dns)
+    by_ip = group_by_ip(resolved)
+    jobs = {
+        "http": (http_check, fan_out(domains, http_ports)),
+        "https": (https_check, fan_out(domains, https_ports)),
+        "ssh": (ssh_check, fan_out(by_ip, ssh_ports)),
+    }
+    swept = ()
+    if PREFILTER:
+        all_ports = sorted(set(http_ports + https_ports + ssh_ports))
+        open_pairs = tcp_sweep(fan_out(by_ip, all_ports), engine)
+
+        def reachable(domain, port):
+            return any((ip, port) in open_pairs for ip in resolved.get(domain, []))
+
+        # Filtres paresseux : les cibles sont écartées au fil du scan, jamais copiées en liste
+        jobs = {
+            "http": (http_check, ((d, p) for d, p in jobs["http"][1] if reachable(d, p))),
+            "https": (https_check, ((d, p) for d, p in jobs["https"][1] if reachable(d, p))),
+        }
+        swept = ((ip, p) for ip, p in fan_out(by_ip, ssh_ports) if (ip, p) in open_pairs)
+    print(f"\n[*] Passe unique ({engine or ENGINE}) : HTTP:{format_ports(http_ports)}, "
+          f"HTTPS:{format_ports(https_ports)}, SSH:{format_ports(ssh_ports)} "
+          f"({len(domains)} domaines, {len(by_ip)} IP uniques pour SSH)...")
+
+    outputs = {"http": HTTP_FILE, "https": HTTPS_FILE, "ssh": SSH_FILE}
+    files = {protocol: open(path, "w") for protocol, path in outputs.items()}
+    found = {protocol: set() for protocol in outputs}
+
+    def record(protocol, domain, port):
+        if (domain, port) in found[protocol]:
+            return
+        found[protocol].add((domain, port))
+        print(f"[+] {domain}:{port} est actif ({protocol})")
+        files[protocol].write(f"{domain}:{port}\n")
+        files[protocol].flush()
+
+    def on_result(protocol, host, port, ok):
+        if not ok:
+            return
+        if protocol == "ssh":
+            # Résultat reporté sur tous les domaines de cette IP
+            for domain in by_ip[host]:
+                record(protocol, domain, port)
+        else:
+            record(protocol, host, port)
+
+    try:
+        for ip, port in swept:
+            on_result("ssh", ip, port, True)
+        scan(jobs, on_result, engine)
+    finally:
+        for f in files.values():
+            f.close()
+    for protocol, path in outputs.items():
+        print(f"[✓] {len(found[protocol])} cibles {protocol.upper()} enregistrées dans {path}")
+
+
 # ----- Fonction principale -----
 def main():
     """Charge les domaines et demande à l'utilisateur les ports à scanner pour chaque service."""
@@ -88,19 +778,27 @@ def main():
         print(f"[!] Le fichier {INPUT_FILE} est introuvable.")
         return
 
-    # Demander les ports à l'utilisateur
+    # Réutiliser les résolutions de l'étape 2 (plus de résolution par service et par domaine)
+    dns = load_dns_cache()
+    for domain, record in load_resolution_records().items():
+        dns.setdefault(domain, record["a"] + record["aaaa"])
+    if dns:
+        missing = [d for d in domains if dns.get(d) == []]
+        domains = [d for d in domains if dns.get(d) != []]
+        install_dns_cache(dns)
+        print(f"[*] Cache DNS : {len(dns)} entrées chargées, {len(missing)} domaines inexistants ignorés.")
+
+    # Demander les ports à l'utilisateur (un port, une liste ou des plages : 80,8080,8000-8010)
     try:
-        http_port = int(input("Entrez le port HTTP à scanner (par défaut 80) : ") or 80)
-        https_port = int(input("Entrez le port HTTPS à scanner (par défaut 443) : ") or 443)
-        ssh_port = int(input("Entrez le port SSH à scanner (par défaut 22) : ") or 22)
-    except ValueError:
-        print("[!] Port invalide, veuillez entrer un nombre.")
+        http_port = parse_ports(input("Entrez le(s) port(s) HTTP à scanner (par défaut 80) : ") or 80)
+        https_port = parse_ports(input("Entrez le(s) port(s) HTTPS à scanner (par défaut 443) : ") or 443)
+        ssh_port = parse_ports(input("Entrez le(s) port(s) SSH à scanner (par défaut 22) : ") or 22)
+    except ValueError as e:
+        print(f"[!] Port invalide ({e}), exemple attendu : 80,8080,8000-8010")
         return
 
-    # Lancer les vérifications
-    run_check(http_check, domains, HTTP_FILE, http_port)
-    run_check(https_check, domains, HTTPS_FILE, https_port)
-    run_check(ssh_check, domains, SSH_FILE, ssh_port)
+    # Lancer les vérifications (HTTP, HTTPS et SSH entrelacés ; SSH sondé par IP)
+    run_all_checks(domains, http_port, https_port, ssh_port, dns)
 
 
 # ----- Point d’entrée -----
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+bench_interleaved.py
+
+Compare trois passes successives (probe_many pour HTTP, puis HTTPS, puis SSH, comme
+l'ancien main()) à la passe unique scan() où les trois protocoles partagent la même
+file de travail, sur la flotte locale de stub_fleet.py.
+
+Vérifie que les deux approches donnent les mêmes cibles actives, puis affiche les temps
+pour chaque moteur.
+
+Usage :
+    python3 bench/bench_interleaved.py [--ok 40] [--hang 30] [--repeat 3] [--timeout 1]
+"""
+
+import sys
+import time
+import argparse
+import warnings
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent))
+
+import active_targets_v3 as at  # noqa: E402
+from stub_fleet import StubFleet  # noqa: E402
+
+warnings.filterwarnings("ignore", message="Unverified HTTPS request")
+
+
+def sequential(jobs, engine):
+    active = set()
+    for protocol, (check, targets) in jobs.items():
+        at.probe_many(check, targets, lambda h, p, ok, protocol=protocol: ok and active.add((protocol, h, p)), engine)
+    return active
+
+
+def interleaved(jobs, engine):
+    active = set()
+    at.scan(jobs, lambda protocol, h, p, ok: ok and active.add((protocol, h, p)), engine)
+    return active
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--ok", type=int, default=40, help="serveurs qui répondent 200")
+    parser.add_argument("--error", type=int, default=10, help="serveurs qui répondent 503")
+    parser.add_argument("--hang", type=int, default=30, help="serveurs qui ne répondent jamais")
+    parser.add_argument("--closed", type=int, default=20, help="ports fermés")
+    parser.add_argument("--repeat", type=int, default=3, help="sondes par port")
+    parser.add_argument("--timeout", type=float, default=1.0, help="TIMEOUT des sondes (s)")
+    args = parser.parse_args()
+
+    at.TIMEOUT = args.timeout
+    at.HOST_CONCURRENCY = at.CONCURRENCY  # toutes les cibles partagent 127.0.0.1 : pas de limite par hôte ici
+    fleet = StubFleet(ok=args.ok, error=args.error, hang=args.hang, closed=args.closed, tls=True).start()
+    plain = [p for p, kind, tls in fleet.targets if not tls]
+    secure = [p for p, kind, tls in fleet.targets if tls or kind == "closed"]
+    jobs = {
+        "http": (at.http_check, [(fleet.host, p) for p in plain] * args.repeat),
+        "https": (at.https_check, [(fleet.host, p) for p in secure] * args.repeat),
+        "ssh": (at.ssh_check, [(fleet.host, p) for p in plain] * args.repeat),
+    }
+    total = sum(len(targets) for _, targets in jobs.values())
+
+    print(f"{total} probes (http/https/ssh), TIMEOUT={at.TIMEOUT}s")
+    print(f"  {'engine':<8} {'3 passes':>9} {'1 pass':>9} {'speedup':>8}")
+    for engine in ("threads", "async"):
+        t0 = time.perf_counter()
+        expected = sequential(jobs, engine)
+        t_seq = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        got = interleaved(jobs, engine)
+        t_one = time.perf_counter() - t0
+        assert got == expected, (engine, len(got), len(expected))
+        print(f"  {engine:<8} {t_seq:>8.2f}s {t_one:>8.2f}s {t_seq / t_one:>7.1f}x   ({len(got)} active)")
+    fleet.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+bench_liveness.py
+
+Compare les deux modes de vérification HTTP(S) d'active_targets_v3 (LIVENESS = "get" :
+GET complet ; "head" : HEAD puis GET limité au premier octet si HEAD est refusé) sur une
+flotte locale (stub_fleet.py) dont les pages font `--body` octets, avec des serveurs qui
+refusent HEAD (405).
+
+Vérifie que les deux modes trouvent les mêmes cibles, puis affiche le temps, le volume
+envoyé par les serveurs et le nombre de connexions, pour chaque moteur.
+
+Usage :
+    python3 bench/bench_liveness.py [--ok 40] [--nohead 10] [--body 1000000] [--repeat 3]
+"""
+
+import sys
+import time
+import argparse
+import warnings
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent))
+
+import active_targets_v3 as at  # noqa: E402
+from stub_fleet import StubFleet  # noqa: E402
+
+warnings.filterwarnings("ignore", message="Unverified HTTPS request")
+
+
+def run(fleet, check, targets, engine):
+    active = set()
+    fleet.reset_stats()
+    t0 = time.perf_counter()
+    at.probe_many(check, targets, lambda h, p, ok: ok and active.add((h, p)), engine)
+    return active, time.perf_counter() - t0, fleet.bytes_sent, fleet.connections
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--ok", type=int, default=40, help="serveurs qui répondent 200")
+    parser.add_argument("--error", type=int, default=10, help="serveurs qui répondent 503")
+    parser.add_argument("--nohead", type=int, default=10, help="serveurs qui refusent HEAD (405)")
+    parser.add_argument("--body", type=int, default=1_000_000, help="taille des pages (octets)")
+    parser.add_argument("--repeat", type=int, default=3, help="sondes par port")
+    parser.add_argument("--timeout", type=float, default=3.0, help="TIMEOUT des sondes (s)")
+    args = parser.parse_args()
+
+    at.TIMEOUT = args.timeout
+    at.HOST_CONCURRENCY = at.CONCURRENCY  # toutes les cibles partagent 127.0.0.1 : pas de limite par hôte ici
+    fleet = StubFleet(ok=args.ok, error=args.error, nohead=args.nohead, hang=0, closed=0,
+                      tls=True, body_size=args.body).start()
+    print(f"{len(fleet.targets)} stub ports x {args.repeat} probes, pages de {args.body} octets")
+    print(f"  {'engine':<8} {'check':<12} {'mode':<5} {'time':>7} {'MB sent':>8} {'conns':>6}")
+    for engine in ("threads", "async"):
+        for label, check, tls in (("http_check", at.http_check, False), ("https_check", at.https_check, True)):
+            targets = [(fleet.host, p) for p, _, t in fleet.targets if t == tls] * args.repeat
+            results = {}
+            for mode in ("get", "head"):
+                at.LIVENESS = mode
+                active, elapsed, sent, conns = run(fleet, check, targets, engine)
+                results[mode] = active
+                print(f"  {engine:<8} {label:<12} {mode:<5} {elapsed:>6.2f}s {sent / 1e6:>8.1f} {conns:>6}")
+            assert results["get"] == results["head"], (engine, label, len(results["get"]), len(results["head"]))
+    fleet.stop()
+
+
+if __name__ == "__main__":
+    main()
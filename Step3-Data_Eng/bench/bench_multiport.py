@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+bench_multiport.py
+
+Mesure le balayage multi-ports d'active_targets_v3 sur une flotte locale (stub_fleet.py)
+qui écoute sur 0.0.0.0 : chaque adresse 127.0.0.x joue un hôte distinct, chaque port un
+comportement (200, jamais de réponse, fermé). Compare une passe par port (run_check
+lancé port après port) à une seule passe domaine × ports (fan_out + probe_many) avec la
+limite par hôte HOST_CONCURRENCY.
+
+Vérifie que les deux approches trouvent les mêmes cibles, puis affiche les temps et le
+nombre maximal de connexions simultanées observé sur un même hôte.
+
+Usage :
+    python3 bench/bench_multiport.py [--hosts 50] [--ok 6] [--hang 4] [--closed 10]
+"""
+
+import sys
+import time
+import argparse
+import warnings
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent))
+
+import active_targets_v3 as at  # noqa: E402
+from stub_fleet import StubFleet  # noqa: E402
+
+warnings.filterwarnings("ignore", message="Unverified HTTPS request")
+
+
+def run(check, targets, engine):
+    active = set()
+    at.probe_many(check, targets, lambda h, p, ok: ok and active.add((h, p)), engine)
+    return active
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--hosts", type=int, default=50, help="hôtes simulés (127.0.0.x)")
+    parser.add_argument("--ok", type=int, default=6, help="ports qui répondent 200")
+    parser.add_argument("--hang", type=int, default=4, help="ports qui ne répondent jamais")
+    parser.add_argument("--closed", type=int, default=10, help="ports fermés")
+    parser.add_argument("--timeout", type=float, default=1.0, help="TIMEOUT des sondes (s)")
+    args = parser.parse_args()
+
+    at.TIMEOUT = args.timeout
+    fleet = StubFleet(ok=args.ok, error=0, hang=args.hang, closed=args.closed, host="0.0.0.0").start()
+    hosts = [f"127.0.0.{i}" for i in range(2, args.hosts + 2)]
+    ports = at.parse_ports([p for p, _, _ in fleet.targets])
+
+    print(f"{len(hosts)} hosts x {len(ports)} ports, TIMEOUT={at.TIMEOUT}s, "
+          f"HOST_CONCURRENCY={at.HOST_CONCURRENCY}")
+    print(f"  {'engine':<8} {'per port':>9} {'fan-out':>9} {'speedup':>8} {'peak/host':>10}")
+    for engine in ("threads", "async"):
+        t0 = time.perf_counter()
+        expected = set()
+        for port in ports:
+            expected |= run(at.http_check, [(h, port) for h in hosts], engine)
+        t_port = time.perf_counter() - t0
+
+        fleet.reset_stats()
+        t0 = time.perf_counter()
+        got = run(at.http_check, at.fan_out(hosts, ports), engine)
+        t_fan = time.perf_counter() - t0
+        assert got == expected, (engine, len(got), len(expected))
+        print(f"  {engine:<8} {t_port:>8.2f}s {t_fan:>8.2f}s {t_port / t_fan:>7.1f}x {max(fleet.peak.values()):>10}"
+              f"   ({len(got)} active)")
+    fleet.stop()
+
+
+if __name__ == "__main__":
+    main()
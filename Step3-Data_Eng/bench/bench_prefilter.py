@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+bench_prefilter.py
+
+Mesure le pré-filtre TCP d'active_targets_v3 sur une flotte locale (stub_fleet.py) où la
+plupart des ports sont fermés ou filtrés (SYN ignorés), comme pour une liste réelle de
+domaines : passe HTTP + HTTPS directe contre tcp_sweep() suivi de la même passe sur les
+seuls ports ouverts.
+
+Vérifie que les deux approches trouvent les mêmes cibles, puis affiche les temps pour
+chaque moteur.
+
+Usage :
+    python3 bench/bench_prefilter.py [--ok 20] [--closed 100] [--filtered 60] [--repeat 3]
+"""
+
+import sys
+import time
+import argparse
+import warnings
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent))
+
+import active_targets_v3 as at  # noqa: E402
+from stub_fleet import StubFleet  # noqa: E402
+
+warnings.filterwarnings("ignore", message="Unverified HTTPS request")
+
+
+def direct(jobs, engine):
+    active = set()
+    at.scan(jobs, lambda protocol, h, p, ok: ok and active.add((protocol, h, p)), engine)
+    return active
+
+
+def prefiltered(jobs, engine):
+    # Couples distincts, comme fan_out(by_ip, ports) dans run_all_checks
+    open_pairs = at.tcp_sweep(dict.fromkeys(pair for _, targets in jobs.values() for pair in targets), engine)
+    jobs = {protocol: (check, [t for t in targets if t in open_pairs]) for protocol, (check, targets) in jobs.items()}
+    return direct(jobs, engine)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--ok", type=int, default=20, help="serveurs qui répondent 200")
+    parser.add_argument("--error", type=int, default=5, help="serveurs qui répondent 503")
+    parser.add_argument("--closed", type=int, default=100, help="ports fermés")
+    parser.add_argument("--filtered", type=int, default=60, help="ports filtrés (SYN ignorés)")
+    parser.add_argument("--repeat", type=int, default=3, help="sondes par port")
+    parser.add_argument("--timeout", type=float, default=3.0, help="TIMEOUT des sondes HTTP(S) (s)")
+    args = parser.parse_args()
+
+    at.TIMEOUT = args.timeout
+    at.HOST_CONCURRENCY = at.CONCURRENCY  # toutes les cibles partagent 127.0.0.1 : pas de limite par hôte ici
+    fleet = StubFleet(ok=args.ok, error=args.error, hang=0, closed=args.closed, filtered=args.filtered,
+                      tls=True).start()
+    plain = [p for p, _, tls in fleet.targets if not tls]
+    secure = [p for p, kind, tls in fleet.targets if tls or kind in ("closed", "filtered")]
+    jobs = {
+        "http": (at.http_check, [(fleet.host, p) for p in plain] * args.repeat),
+        "https": (at.https_check, [(fleet.host, p) for p in secure] * args.repeat),
+    }
+    total = sum(len(targets) for _, targets in jobs.values())
+
+    print(f"{total} HTTP/HTTPS probes, TIMEOUT={at.TIMEOUT}s, PREFILTER_TIMEOUT={at.PREFILTER_TIMEOUT}s")
+    print(f"  {'engine':<8} {'direct':>9} {'prefilter':>10} {'speedup':>8}")
+    for engine in ("threads", "async"):
+        t0 = time.perf_counter()
+        expected = direct(jobs, engine)
+        t_direct = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        got = prefiltered(jobs, engine)
+        t_pre = time.perf_counter() - t0
+        assert got == expected, (engine, len(got), len(expected))
+        print(f"  {engine:<8} {t_direct:>8.2f}s {t_pre:>9.2f}s {t_direct / t_pre:>7.1f}x   ({len(got)} active)")
+    fleet.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+bench_probe_engines.py
+
+Compare les moteurs de sondes d'active_targets_v3 ("threads" : requests +
+ThreadPoolExecutor(MAX_THREADS), "async" : asyncio.open_connection + HTTP/1.1 minimal)
+sur une flotte locale de serveurs (stub_fleet.py) : ports qui répondent 200, ports
+en erreur 503, redirections 301 (vers un port actif, en erreur, fermé, ou en boucle),
+ports qui acceptent puis ne répondent jamais, ports fermés.
+
+Vérifie que les deux moteurs donnent les mêmes résultats, puis affiche les temps. Le
+TIMEOUT par défaut (2 s) laisse aux redirections HTTPS le temps de leur second handshake :
+clients et serveurs partagent ici un seul processus, et 600 handshakes TLS simultanés
+saturent le CPU.
+
+Usage :
+    python3 bench/bench_probe_engines.py [--ok 40] [--redirect 12] [--hang 30] [--repeat 5] [--timeout 2]
+"""
+
+import sys
+import time
+import argparse
+import warnings
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent))
+
+import active_targets_v3 as at  # noqa: E402
+from stub_fleet import StubFleet  # noqa: E402
+
+warnings.filterwarnings("ignore", message="Unverified HTTPS request")
+
+
+def run(engine, check, targets):
+    """Sonde `targets` avec `engine` ; retourne (couples actifs, secondes)."""
+    active = set()
+
+    def on_result(host, port, ok):
+        if ok:
+            active.add((host, port))
+
+    t0 = time.perf_counter()
+    at.probe_many(check, targets, on_result, engine=engine)
+    return active, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--ok", type=int, default=40, help="serveurs qui répondent 200")
+    parser.add_argument("--error", type=int, default=10, help="serveurs qui répondent 503")
+    parser.add_argument("--redirect", type=int, default=12, help="serveurs qui redirigent (301)")
+    parser.add_argument("--hang", type=int, default=30, help="serveurs qui ne répondent jamais")
+    parser.add_argument("--closed", type=int, default=20, help="ports fermés")
+    parser.add_argument("--repeat", type=int, default=5, help="sondes par port (domaines sur la même IP)")
+    parser.add_argument("--timeout", type=float, default=2.0, help="TIMEOUT des sondes (s)")
+    args = parser.parse_args()
+
+    at.TIMEOUT = args.timeout
+    at.HOST_CONCURRENCY = at.CONCURRENCY  # toutes les cibles partagent 127.0.0.1 : pas de limite par hôte ici
+    fleet = StubFleet(ok=args.ok, error=args.error, hang=args.hang, closed=args.closed, redirect=args.redirect, tls=True).start()
+
+    cases = [("http_check", at.http_check, False), ("ssh_check", at.ssh_check, False)]
+    if fleet.ports("ok", tls=True):
+        cases.insert(1, ("https_check", at.https_check, True))
+
+    print(f"{len(fleet.targets)} stub ports x {args.repeat} probes, TIMEOUT={at.TIMEOUT}s, "
+          f"MAX_THREADS={at.MAX_THREADS}, CONCURRENCY={at.CONCURRENCY}")
+    print(f"  {'check':<12} {'targets':>8} {'threads':>9} {'async':>9} {'speedup':>8}")
+    for label, check, tls in cases:
+        ports = [p for p, kind, t in fleet.targets if t == tls or kind == "closed"]
+        targets = [(fleet.host, p) for p in ports] * args.repeat
+        threads, t_threads = run("threads", check, targets)
+        aio, t_async = run("async", check, targets)
+        assert threads == aio, (label, len(threads), len(aio))
+        print(f"  {label:<12} {len(targets):>8} {t_threads:>8.2f}s {t_async:>8.2f}s {t_threads / t_async:>7.1f}x"
+              f"   ({len(aio)} active)")
+    fleet.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+stub_fleet.py
+
+Flotte de serveurs locaux pour les benchmarks de l'étape 3 (aucun accès réseau).
+
+Chaque port a un comportement :
+ - "ok"     : HTTP 200 (corps de `body_size` octets, keep-alive supporté)
+ - "error"  : HTTP 503
+ - "nohead" : HTTP 405 pour HEAD, 200 pour GET (comme "ok")
+ - "redirect" : HTTP 301, à tour de rôle vers un port "ok", "error", "closed" du même
+   schéma, ou vers lui-même (boucle sans fin)
+ - "hang"   : accepte la connexion puis ne répond jamais
+ - "closed" : rien n'écoute (connexion refusée)
+ - "filtered" : file d'attente d'acceptation pleine, les SYN sont ignorés (la connexion
+   expire, comme derrière un pare-feu qui jette les paquets)
+Avec tls=True, les ports "ok", "error", "nohead", "redirect" et "hang" existent aussi en HTTPS (certificat
+auto-signé généré avec la commande openssl).
+
+Avec host="0.0.0.0", chaque port répond aussi sur toutes les adresses 127.0.0.x : une
+même flotte simule alors autant d'hôtes distincts (voir `peak`, connexions simultanées
+par adresse).
+
+Usage :
+    fleet = StubFleet(ok=20, error=5, hang=10, closed=10).start()
+    for port, kind, tls in fleet.targets: ...
+    fleet.stop()
+"""
+
+import ssl
+import socket
+import asyncio
+import tempfile
+import threading
+import subprocess
+from pathlib import Path
+from collections import Counter
+
+KINDS = ("ok", "error", "nohead", "redirect", "hang", "closed", "filtered")
+REDIRECT_TARGETS = ("ok", "error", "closed", "loop")
+
+
+def _self_signed_context(directory):
+    """Contexte serveur TLS avec un certificat auto-signé (None si openssl est absent)."""
+    cert, key = Path(directory) / "cert.pem", Path(directory) / "key.pem"
+    try:
+        subprocess.run(
+            ["openssl", "req", "-x509", "-newkey", "ec", "-pkeyopt", "ec_paramgen_curve:prime256v1",
+             "-nodes", "-days", "1",
+             "-subj", "/CN=localhost", "-keyout", str(key), "-out", str(cert)],
+            check=True, capture_output=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(cert, key)
+    return context
+
+
+class StubFleet:
+    """Serveurs de test dans un thread (boucle asyncio dédiée)."""
+
+    def __init__(self, ok=10, error=2, hang=5, closed=5, tls=False, body_size=0, delay=0.0,
+                 host="127.0.0.1", nohead=0, filtered=0, redirect=0):
+        self.counts = {"ok": ok, "error": error, "nohead": nohead, "redirect": redirect, "hang": hang,
+                       "closed": closed, "filtered": filtered}
+        self.tls = tls
+        self.body = b"x" * body_size
+        self.delay = delay
+        self.host = host
+        self.targets = []            # [(port, kind, tls)]
+        self.redirects = {}          # port "redirect" -> (schéma, port visé ou None pour la boucle)
+        self.connections = 0
+        self.requests = Counter()    # méthode HTTP -> nombre
+        self.bytes_sent = 0
+        self.peak = Counter()        # adresse locale -> connexions simultanées au maximum
+        self._open = Counter()
+        self._writers = set()
+        self._loop = None
+        self._thread = None
+        self._servers = []
+        self._sockets = []           # sockets des ports "filtered"
+        self._tmp = tempfile.TemporaryDirectory()
+
+    def ports(self, kind, tls=False):
+        return [p for p, k, t in self.targets if k == kind and t == tls]
+
+    def reset_stats(self):
+        self.connections = 0
+        self.requests = Counter()
+        self.bytes_sent = 0
+        self.peak = Counter()
+
+    async def _handle(self, kind, reader, writer):
+        self.connections += 1
+        # Adresse visée par le client (127.0.0.x quand la flotte écoute sur 0.0.0.0)
+        local, port = writer.get_extra_info("sockname")[:2]
+        self._open[local] += 1
+        self.peak[local] = max(self.peak[local], self._open[local])
+        self._writers.add(writer)
+        try:
+            if kind == "hang":
+                await reader.read()
+                return
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                    return
+                lines = head.decode("latin-1").split("\r\n")
+                method = lines[0].split(" ", 1)[0]
+                headers = {k.strip().lower(): v.strip() for k, _, v in (l.partition(":") for l in lines[1:] if l)}
+                self.requests[method] += 1
+                if self.delay:
+                    await asyncio.sleep(self.delay)
+                writer.write(self._response(kind, method, headers, port))
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    return
+        except (ConnectionError, ssl.SSLError):
+            pass
+        finally:
+            self._open[local] -= 1
+            self._writers.discard(writer)
+            writer.close()
+
+    def _response(self, kind, method, headers, port):
+        if kind == "redirect":
+            scheme, target = self.redirects[port]
+            host = headers.get("host", self.host).rsplit(":", 1)[0]
+            location = "/" if target is None else f"{scheme}://{host}:{target}/"
+            return self._send("301 Moved Permanently", b"", method, f"Location: {location}\r\n")
+        if kind == "nohead":
+            if method == "HEAD":
+                return self._send("405 Method Not Allowed", b"", method)
+            kind = "ok"
+        status, body = ("200 OK", self.body) if kind == "ok" else ("503 Service Unavailable", b"down")
+        if kind == "ok" and headers.get("range", "").startswith("bytes=0-0") and body:
+            status, body = "206 Partial Content", body[:1]
+        return self._send(status, body, method)
+
+    def _send(self, status, body, method, extra=""):
+        head = (f"HTTP/1.1 {status}\r\nContent-Type: text/html\r\n{extra}"
+                f"Content-Length: {len(body)}\r\n\r\n").encode()
+        data = head if method == "HEAD" else head + body
+        self.bytes_sent += len(data)
+        return data
+
+    def _filtered_port(self):
+        """Socket en écoute jamais acceptée, file d'attente (backlog 0) remplie par un client."""
+        server = socket.socket()
+        server.bind((self.host, 0))
+        server.listen(0)
+        filler = socket.create_connection(server.getsockname(), timeout=1)
+        self._sockets += [server, filler]
+        return server.getsockname()[1]
+
+    async def _start_servers(self):
+        tls_context = _self_signed_context(self._tmp.name) if self.tls else None
+        for tls in (False, True) if tls_context else (False,):
+            for kind in KINDS:
+                for _ in range(self.counts[kind]):
+                    if kind == "filtered":
+                        port = self._filtered_port()
+                    elif kind == "closed":
+                        # port libre : ouvert puis refermé aussitôt
+                        server = await asyncio.start_server(lambda r, w: None, self.host, 0)
+                        port = server.sockets[0].getsockname()[1]
+                        server.close()
+                        await server.wait_closed()
+                    else:
+                        server = await asyncio.start_server(
+                            lambda r, w, kind=kind: self._handle(kind, r, w), self.host, 0,
+                            ssl=tls_context if tls else None, backlog=4096,
+                        )
+                        port = server.sockets[0].getsockname()[1]
+                        self._servers.append(server)
+                    self.targets.append((port, kind, tls))
+        for tls in (False, True):
+            for i, port in enumerate(self.ports("redirect", tls)):
+                targets = self.ports(REDIRECT_TARGETS[i % len(REDIRECT_TARGETS)], tls)
+                self.redirects[port] = ("https" if tls else "http", targets[i % len(targets)] if targets else None)
+
+    def start(self):
+        ready = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            self._loop.run_until_complete(self._start_servers())
+            ready.set()
+            self._loop.run_forever()
+            for server in self._servers:
+                server.close()
+            # connexions encore ouvertes (keep-alive des sessions, ports "hang") : fermées
+            # côté serveur pour que leurs tâches se terminent avant la fermeture de la boucle
+            for writer in list(self._writers):
+                writer.close()
+            pending = asyncio.all_tasks(self._loop)
+            if pending:
+                self._loop.run_until_complete(asyncio.wait(pending, timeout=1))
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self
+
+    def stop(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        for sock in self._sockets:
+            sock.close()
+        self._tmp.cleanup()